@@ -0,0 +1,223 @@
+from collections import deque
+import numpy as np
+from state import directions, l_checks
+from utils.deadlock_patterns import DeadlockPatterns
+from utils.matching import BoxGoalMatcher
+from utils.zobrist import ZobristTable
+
+
+class Board:
+    """
+    Static context of a Sokoban level.
+
+    It is built once by utils.parser.parse_board_from_file and shared by the
+    State successor generator, the heuristics and every solver, so all the work
+    that only depends on the level (bounds, wall lookups, dead squares...) is
+    done once per level instead of once per node.
+
+    Cells can be addressed either by (row, col) tuples or by their linear index
+    (row * cols + col), see index() and position().
+    """
+
+    def __init__(self, walls, goal_positions, player_pos, box_positions):
+        self.walls = frozenset(walls)
+        self.goal_positions = frozenset(goal_positions)
+        self.player_pos = player_pos
+        self.box_positions = frozenset(box_positions)
+
+        # Bounds of the walls (the original deadlock check used these to build whole rows/columns)
+        self.min_row = min(r for r, _ in self.walls)
+        self.max_row = max(r for r, _ in self.walls)
+        self.min_col = min(c for _, c in self.walls)
+        self.max_col = max(c for _, c in self.walls)
+
+        # Grid size, big enough to hold every parsed position
+        all_positions = self.walls | self.goal_positions | self.box_positions | {player_pos}
+        self.rows = max(r for r, _ in all_positions) + 1
+        self.cols = max(c for _, c in all_positions) + 1
+
+        # Wall bitmap: one byte per cell, indexed by linear cell index
+        self.wall_map = bytearray(self.rows * self.cols)
+        for wall in self.walls:
+            self.wall_map[self.index(wall)] = 1
+
+        # Floor the player can reach from its initial position, ignoring boxes
+        self.floor = self._reachable_floor()
+
+        # Per-cell deadlock flags for non-wall cells without a goal
+        self.corner_dead = frozenset(pos for pos in self._inner_cells() if self._is_corner(pos))
+        self.wall_line_dead = frozenset(pos for pos in self._inner_cells() if self._is_on_wall_line(pos))
+
+        # Minimum pushes from every cell to every goal, found by pulling a box backwards from the goal
+        self.push_distances = {goal: self.pull_distances(goal) for goal in self.goal_positions}
+
+        # Simple deadlocks: floor cells from which a box can never be pushed to any goal
+        pullable = set()
+        for distances in self.push_distances.values():
+            pullable.update(distances)
+        self.simple_dead_squares = frozenset(self.floor - pullable)
+
+        # Same distances as a NumPy table: push_table[g, cell] = pushes from cell to goal_list[g] (inf if impossible)
+        self.goal_list = sorted(self.goal_positions)
+        self.push_table = np.full((len(self.goal_list), self.rows * self.cols), np.inf)
+        for g, goal in enumerate(self.goal_list):
+            for pos, distance in self.push_distances[goal].items():
+                self.push_table[g, self.index(pos)] = distance
+        self.nearest_goal_distance = self.push_table.min(axis=0)
+
+        self.dead_squares = self.corner_dead | self.wall_line_dead | self.simple_dead_squares
+
+        # Optimal box-to-goal matching over push_table (hungarian heuristic)
+        self.box_goal_matcher = BoxGoalMatcher(self)
+
+        # Index-based lookups used by CompactState
+        self.move_offsets = {action: di * self.cols + dj for action, (di, dj) in directions.items()}
+        self.dead_map = bytearray(self.rows * self.cols)
+        for pos in self.dead_squares:
+            self.dead_map[self.index(pos)] = 1
+        self.goal_mask = self.mask_of(self.goal_positions)
+        self.goal_map = np.zeros(self.rows * self.cols, dtype=bool)
+        for goal in self.goal_positions:
+            self.goal_map[self.index(goal)] = True
+
+        # Tables for the batched box-goal distance heuristics. goal_order is the order
+        # set(goal_positions) iterates in, the one the scalar versions try the goals in,
+        # so both pick the same goal on ties.
+        self.goal_order = list(set(self.goal_positions))
+        cell_rows, cell_cols = np.divmod(np.arange(self.rows * self.cols), self.cols)
+        row_gaps = np.abs(cell_rows[:, None] - np.array([goal[0] for goal in self.goal_order]))
+        col_gaps = np.abs(cell_cols[:, None] - np.array([goal[1] for goal in self.goal_order]))
+        self.manhattan_table = row_gaps + col_gaps  # manhattan_table[cell, g]
+        self.euclidean_table = np.sqrt(row_gaps ** 2 + col_gaps ** 2)
+        # has_deadlocks by cell: a box there is dead on its own, or with another box next to it
+        # in that direction (the l_checks walls); never on a goal
+        self.dead_box_map = np.zeros(self.rows * self.cols, dtype=bool)
+        self.pair_dead_maps = {action: np.zeros(self.rows * self.cols, dtype=bool) for action in directions}
+        for pos in self.floor - self.goal_positions:
+            idx = self.index(pos)
+            self.dead_box_map[idx] = pos in self.dead_squares
+            for action, pairs in l_checks.items():
+                self.pair_dead_maps[action][idx] = any(
+                    (pos[0] + a[0], pos[1] + a[1]) in self.walls and (pos[0] + b[0], pos[1] + b[1]) in self.walls
+                    for a, b in pairs)
+
+        # Proven 3x3 deadlock patterns, looked up around every pushed box
+        self.deadlock_patterns = DeadlockPatterns(self)
+
+        # Random per-cell keys so states can hash incrementally
+        self.zobrist = ZobristTable(self.rows * self.cols)
+
+        # Pattern databases (utils.pattern_database) built for this board, by group size.
+        # source_hash is set by the parser and keys their cache files.
+        self.pattern_databases = {}
+        self.source_hash = None
+
+    def __repr__(self):
+        return f"Board(rows={self.rows}, cols={self.cols}, boxes={len(self.box_positions)})"
+
+    def index(self, pos):
+        return pos[0] * self.cols + pos[1]
+
+    def position(self, idx):
+        return divmod(idx, self.cols)
+
+    def zobrist_key(self, player, boxes):
+        return self.zobrist.key(self.index(player), (self.index(box) for box in boxes))
+
+    def mask_of(self, positions):
+        """
+        Bitmask with one bit set per position (bit number = linear cell index).
+        """
+        mask = 0
+        for pos in positions:
+            mask |= 1 << self.index(pos)
+        return mask
+
+    def positions_of(self, mask):
+        """
+        Inverse of mask_of: frozenset of the (row, col) positions whose bit is set.
+        """
+        positions = []
+        while mask:
+            low = mask & -mask
+            positions.append(self.position(low.bit_length() - 1))
+            mask ^= low
+        return frozenset(positions)
+
+    def pull_distances(self, goal):
+        """
+        Reverse BFS from a goal where the box is pulled instead of pushed.
+
+        Pulling a box from b towards direction d needs the player to stand on b+d
+        and step back to b+2d, so both cells must be floor. Other boxes are ignored.
+
+        Returns a dict {cell: minimum number of pushes to take a box from cell to goal}.
+        """
+        distances = {goal: 0}
+        queue = deque([goal])
+        while queue:
+            box = queue.popleft()
+            for di, dj in directions.values():
+                new_box = (box[0] + di, box[1] + dj)
+                new_player = (new_box[0] + di, new_box[1] + dj)
+                if new_box in distances or new_box not in self.floor or new_player not in self.floor:
+                    continue
+                distances[new_box] = distances[box] + 1
+                queue.append(new_box)
+        return distances
+
+    def _inner_cells(self):
+        for r in range(self.min_row, self.max_row + 1):
+            for c in range(self.min_col, self.max_col + 1):
+                pos = (r, c)
+                if pos not in self.walls and pos not in self.goal_positions:
+                    yield pos
+
+    def _reachable_floor(self):
+        reached = {self.player_pos}
+        queue = deque([self.player_pos])
+        while queue:
+            r, c = queue.popleft()
+            for di, dj in directions.values():
+                neighbor = (r + di, c + dj)
+                if neighbor in reached or neighbor in self.walls:
+                    continue
+                if not (self.min_row <= neighbor[0] <= self.max_row and self.min_col <= neighbor[1] <= self.max_col):
+                    continue
+                reached.add(neighbor)
+                queue.append(neighbor)
+        return frozenset(reached)
+
+    def _is_corner(self, pos):
+        row, col = pos
+        corner_checks = [
+            (directions['U'], directions['R']),
+            (directions['R'], directions['D']),
+            (directions['D'], directions['L']),
+            (directions['L'], directions['U'])
+        ]
+        for d1, d2 in corner_checks:
+            if (row + d1[0], col + d1[1]) in self.walls and (row + d2[0], col + d2[1]) in self.walls:
+                return True
+        return False
+
+    def _is_on_wall_line(self, pos):
+        """
+        True if the cell is next to a full wall row (or column) and its own row
+        (or column) has no goals, so a box pushed there can never leave that line.
+        """
+        row, col = pos
+        for key, (di, dj) in directions.items():
+            if (row + di, col + dj) not in self.walls:
+                continue
+            if key in ["U", "D"]:
+                cols = range(self.min_col, self.max_col + 1)
+                if not any((row, c) in self.goal_positions for c in cols) and \
+                        all((row + di, c) in self.walls for c in cols):
+                    return True
+            if key in ["L", "R"]:
+                rows = range(self.min_row, self.max_row + 1)
+                if not any((r, col) in self.goal_positions for r in rows) and \
+                        all((r, col + dj) in self.walls for r in rows):
+                    return True
+        return False
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import statistics
+import subprocess
+import sys
+import time
+
+# === Configuración ===
+# Presupuesto de arranque: `python main.py boards/b1.txt bfs` completo (import + parseo + solve)
+STARTUP_BUDGET_SEC = 0.35
+RUNS = 7
+COMMAND = [sys.executable, "main.py", "boards/b1.txt", "bfs", "--no-cache"]
+
+# Módulos de graficado que el solver no debe cargar
+PLOTTING_MODULES = ["matplotlib", "pandas", "seaborn"]
+
+
+def measure_startup(runs=RUNS):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(COMMAND, stdout=subprocess.DEVNULL, check=True)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def loaded_plotting_modules():
+    code = ("import sys, main; main.solve('boards/b1.txt', 'bfs', use_cache=False); "
+            f"print(','.join(m for m in {PLOTTING_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return [name for name in output.stdout.strip().split(",") if name]
+
+
+if __name__ == "__main__":
+    ok = True
+
+    loaded = loaded_plotting_modules()
+    if loaded:
+        print(f"❌ main.py carga módulos de graficado: {', '.join(loaded)}")
+        ok = False
+
+    median = measure_startup()
+    if median > STARTUP_BUDGET_SEC:
+        print(f"❌ Arranque: {median:.3f} s (presupuesto {STARTUP_BUDGET_SEC:.2f} s)")
+        ok = False
+    else:
+        print(f"✅ Arranque: {median:.3f} s (presupuesto {STARTUP_BUDGET_SEC:.2f} s)")
+
+    sys.exit(0 if ok else 1)
@@ -1,45 +1,169 @@
+import os
 import sys
-from state import State
-from search import bfs, dfs, iddfs, greedy, astar
+from state import State, CompactState
+from search import bfs, dfs, iddfs, greedy, astar, idastar, bidirectional, parallel_astar, external_bfs
 from utils import heuristics
 from utils.parser import parse_board_from_file
+from utils.metrics import state_size_bytes
+from utils.deadlocks import DeadlockChecks
+from utils.limits import SearchLimits
+from utils.solution_cache import SolutionCache
 
+ALGORITHMS = ['bfs', 'bfs_external', 'dfs', 'iddfs', 'greedy', 'astar', 'bidirectional', 'astar_parallel', 'idastar']
+# Algorithms that use the heuristic (the others ignore it)
+INFORMED_ALGORITHMS = ['greedy', 'astar', 'astar_parallel', 'idastar']
 
-def solve(file_path, algorithm, heuristic=heuristics.manhattan_distance):
-    walls, goal_positions, player_pos, box_positions = parse_board_from_file(file_path)
-    initial_state = State(player_pos, box_positions)
 
-    if algorithm == 'bfs':
-        return bfs.solve_with_bfs(initial_state,walls,goal_positions)
+def solve(file_path, algorithm, heuristic=heuristics.manhattan_distance, push_mode=False, compact=False,
+          cache_size=0, transposition_size=0, workers=None, limits=None, freeze=False, corral=False,
+          use_cache=True, verify_keys=False):
+    board = parse_board_from_file(file_path)
+    solution_cache = SolutionCache() if use_cache else None
+    try:
+        return solve_board(board, algorithm, heuristic, push_mode, compact, cache_size, transposition_size, workers,
+                           limits, freeze, corral, solution_cache, verify_keys)
+    finally:
+        if solution_cache is not None:
+            solution_cache.close()
+
+
+def solve_board(board, algorithm, heuristic=heuristics.manhattan_distance, push_mode=False, compact=False,
+                cache_size=0, transposition_size=0, workers=None, limits=None, freeze=False, corral=False,
+                solution_cache=None, verify_keys=False):
+    """
+    Same as solve, for a board that is already parsed (lets runners reuse it across runs).
+
+    limits is an optional utils.limits.SearchLimits; when it runs out the result is
+    "timeout" or "limit" instead of "solved" / "no solution".
+
+    freeze and corral turn on the freeze / PI-corral deadlock checks of utils.deadlocks
+    for this run; the number of pushes each one pruned is added to the result.
+
+    verify_keys makes the key-only visited / transposition structures keep the
+    states too and compare them on every hit, so a Zobrist collision can't merge
+    two different states; the collisions found are reported as key_collisions.
+
+    solution_cache is an optional utils.solution_cache.SolutionCache: a solution
+    already stored for this board, algorithm, heuristic and options (all of the
+    arguments above) is returned (marked "cached") without searching, and new
+    solutions are stored.
+    """
+    # Checked first: the cache lookup and the dead-position shortcut below would answer for any name
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    # Per-run options and counters; the board is shared by every run on the level
+    checks = DeadlockChecks(freeze, corral) if freeze or corral else None
+
+    if compact:
+        initial_state = CompactState.from_positions(board, board.player_pos, board.box_positions)
+    else:
+        initial_state = State(board.player_pos, board.box_positions, board)
+
+    if push_mode and algorithm not in ['bfs', 'greedy', 'astar']:
+        raise ValueError(f"Push mode is not supported by algorithm: {algorithm}")
+    if compact and algorithm in ['bidirectional', 'astar_parallel']:
+        raise ValueError(f"Algorithm {algorithm} does not support compact states")
+
+    if solution_cache is not None:
+        heuristic_name = heuristic.__name__ if heuristic is not None and algorithm in INFORMED_ALGORITHMS \
+            else "no_heuristic"
+        # Every option that can change the result or its metrics is part of the key
+        settings = [("push", push_mode), ("freeze", freeze), ("corral", corral), ("compact", compact),
+                    ("verify", verify_keys), ("hcache", cache_size), ("tt", transposition_size), ("workers", workers)]
+        if limits is not None:
+            settings += [("time", limits.time_limit), ("nodes", limits.max_nodes), ("memory", limits.max_memory_mb)]
+        options = ",".join(name if value is True else f"{name}={value}" for name, value in settings if value)
+        result = solution_cache.get(board, algorithm, heuristic_name, options)
+        if result is not None:
+            result["state_size_bytes"] = state_size_bytes(initial_state)
+            return result
+
+    prepare = getattr(heuristic, "prepare", None) if algorithm in INFORMED_ALGORITHMS else None
+    if prepare is not None:
+        # Heuristic setup (e.g. building a pattern database) isn't part of the search time or its limits
+        prepare(board)
+
+    if board.deadlock_patterns.is_dead_position(board, board.box_positions):
+        # Pushes are checked against the deadlock patterns as they're generated; the initial boxes only here
+        result = {
+            "result": "no solution",
+            "cost": None,
+            "expanded_nodes_qty": 0,
+            "frontier_nodes_qty": 0,
+            "solution": "",
+            "duration": 0
+        }
+    elif algorithm == 'bfs':
+        result = bfs.solve_with_bfs(initial_state, board, push_mode, limits, verify_keys, checks)
+    elif algorithm == 'bfs_external':
+        result = external_bfs.solve_with_external_bfs(initial_state, board, limits=limits, deadlock_checks=checks)
     elif algorithm == 'dfs':
-        return dfs.solve_with_dfs(initial_state,walls,goal_positions)
+        result = dfs.solve_with_dfs(initial_state, board, limits, verify_keys, checks)
     elif algorithm == 'iddfs':
-        return iddfs.solve_with_iddfs(initial_state,walls,goal_positions)
+        result = iddfs.solve_with_iddfs(initial_state, board, limits=limits, deadlock_checks=checks)
     elif algorithm == 'greedy':
-        return greedy.solve_with_greedy(initial_state, heuristic, goal_positions, walls)
+        result = greedy.solve_with_greedy(initial_state, heuristic, board, push_mode, cache_size, limits, verify_keys,
+                                          checks)
     elif algorithm == 'astar':
-        return astar.solve_with_astar(initial_state, heuristic,  goal_positions, walls)
+        result = astar.solve_with_astar(initial_state, heuristic, board, push_mode, cache_size, limits, verify_keys,
+                                        checks)
+    elif algorithm == 'bidirectional':
+        result = bidirectional.solve_with_bidirectional(initial_state, board, limits, checks)
+    elif algorithm == 'astar_parallel':
+        result = parallel_astar.solve_with_parallel_astar(initial_state, heuristic, board, workers or os.cpu_count(),
+                                                          limits=limits, deadlock_checks=checks)
+    elif algorithm == 'idastar':
+        result = idastar.solve_with_idastar(initial_state, heuristic, board, transposition_size, limits,
+                                            verify_keys, checks)
     else:
         raise ValueError(f"Unknown algorithm: {algorithm}")
 
+    if solution_cache is not None:
+        solution_cache.put(board, algorithm, heuristic_name, result, options)
+
+    result["state_size_bytes"] = state_size_bytes(initial_state)
+    if freeze:
+        result["freeze_pruned"] = checks.pruned["freeze"]
+    if corral:
+        result["corral_pruned"] = checks.pruned["corral"]
+    return result
+
 """
     # Compatible with Python 3.10+ 
     match algorithm:
-        case 'bfs': return bfs.solve_with_bfs(initial_state, walls, goal_positions)
-        case 'dfs': return dfs.solve_with_dfs(initial_state, walls, goal_positions)
-        case 'iddfs': return iddfs.solve_with_iddfs(initial_state, walls, goal_positions)
-        case 'greedy': return greedy.solve_with_greedy(initial_state, walls, goal_positions)
-        case 'astar': return astar.solve_with_astar(initial_state, walls, goal_positions)
+        case 'bfs': return bfs.solve_with_bfs(initial_state, board)
+        case 'dfs': return dfs.solve_with_dfs(initial_state, board)
+        case 'iddfs': return iddfs.solve_with_iddfs(initial_state, board)
+        case 'greedy': return greedy.solve_with_greedy(initial_state, heuristic, board)
+        case 'astar': return astar.solve_with_astar(initial_state, heuristic, board)
         case _: raise ValueError(f"Unknown algorithm: {algorithm}")
 """
 
 
+def csv_row(board_file_path, algorithm, heuristic, result):
+    return (f"{board_file_path},{algorithm},{heuristic},{result['result']},{result['cost']},"
+            f"{result['expanded_nodes_qty']},{result['frontier_nodes_qty']},{result['duration']:.4f},{result['solution']},"
+            f"{bool(result.get('cached'))}")
+
+
+def limits_from_args(time_limit=None, max_nodes=None, max_memory_mb=None):
+    if time_limit is None and max_nodes is None and max_memory_mb is None:
+        return None
+    return SearchLimits(time_limit, max_nodes, max_memory_mb)
+
+
 def get_heuristic_function(name: str):
     heuristics_map = {
         "manhattan": heuristics.manhattan_distance,
         "euclidean": heuristics.euclidean_distance,
         "linear_conflict": heuristics.manhattan_linear_conflicts_distance,
         "manhattan_player":heuristics.manhattan_linear_conflicts_distance,
+        "hungarian": heuristics.hungarian_distance,
+        "push_distance": heuristics.push_distance,
+        "push_distance_player": heuristics.push_distance_player,
+        "pdb": heuristics.pattern_database_distance,
+        "pdb3": heuristics.pattern_database3_distance,
     }
 
     if name == "no_heuristic":
@@ -50,42 +174,101 @@ def get_heuristic_function(name: str):
 
     return heuristics_map[name]
 
+
+def flag_value(args, flag, cast, usage):
+    """Value that follows a command line flag; prints the usage line and exits if it's missing."""
+    value = next(args, None)
+    if value is None:
+        print(f"\033[91mMissing value for {flag}\n{usage}\033[0m")
+        sys.exit(1)
+    return cast(value)
+
+
+USAGE = ("Usage: python main.py <board_file_path> <algorithm> [heuristic] [--csv] [--push] [--compact] [--hcache N] "
+         "[--tt N] [--workers N] [--time-limit SEG] [--max-nodes N] [--max-memory MB] [--freeze] [--corral] "
+         "[--no-cache] [--verify-keys]")
+
 if __name__ == "__main__":
     if len(sys.argv) < 3:
-        print("\033[91mUsage: python main.py <board_file_path> <algorithm>\033[0m")
+        print(f"\033[91m{USAGE}\033[0m")
         sys.exit(1)
 
     board_file_path = sys.argv[1]    # first argument: file path
     algorithm = sys.argv[2]          # second argument: bfs, dfs, etc.
     heuristic = "manhattan"
     csv_mode = False
+    push_mode = False
+    compact = False
+    cache_size = 0
+    transposition_size = 0
+    workers = None
+    time_limit = max_nodes = max_memory_mb = None
+    freeze = corral = False
+    use_cache = True
+    verify_keys = False
 
     # Parse simple flags/positionals
-    if len(sys.argv) >= 4:
-        arg3 = sys.argv[3]
-        if arg3.startswith("--"):
-            csv_mode = (arg3 == "--csv")
-        else:
-            heuristic = arg3
-            if len(sys.argv) >= 5 and sys.argv[4] == "--csv":
-                csv_mode = True
-
-    if algorithm.lower() in ["bfs", "dfs", "iddfs"]:
+    args = iter(sys.argv[3:])
+    for arg in args:
+        if arg == "--csv":
+            csv_mode = True
+        elif arg == "--push":
+            push_mode = True
+        elif arg == "--compact":
+            compact = True
+        elif arg == "--hcache":
+            cache_size = flag_value(args, arg, int, USAGE)
+        elif arg == "--tt":
+            transposition_size = flag_value(args, arg, int, USAGE)
+        elif arg == "--workers":
+            workers = flag_value(args, arg, int, USAGE)
+        elif arg == "--time-limit":
+            time_limit = flag_value(args, arg, float, USAGE)
+        elif arg == "--max-nodes":
+            max_nodes = flag_value(args, arg, int, USAGE)
+        elif arg == "--max-memory":
+            max_memory_mb = flag_value(args, arg, float, USAGE)
+        elif arg == "--freeze":
+            freeze = True
+        elif arg == "--corral":
+            corral = True
+        elif arg == "--no-cache":
+            use_cache = False
+        elif arg == "--verify-keys":
+            verify_keys = True
+        elif not arg.startswith("--"):
+            heuristic = arg
+
+    if algorithm.lower() in ["bfs", "bfs_external", "dfs", "iddfs", "bidirectional"]:
         heuristic = "no_heuristic"
-    result = solve(board_file_path, algorithm, get_heuristic_function(heuristic))
+    result = solve(board_file_path, algorithm, get_heuristic_function(heuristic), push_mode, compact,
+                   cache_size, transposition_size, workers, limits_from_args(time_limit, max_nodes, max_memory_mb),
+                   freeze, corral, use_cache, verify_keys)
 
     if csv_mode:
         # CSV row only
-        print(f"{board_file_path},{algorithm},{heuristic},{result['result']},{result['cost']},"
-              f"{result['expanded_nodes_qty']},{result['frontier_nodes_qty']},{result['duration']:.4f},{result['solution']}")
+        print(csv_row(board_file_path, algorithm, heuristic, result))
     else:
         # Pretty print
         print("=== Sokoban Solver Result ===")
-        print(f"Result: {result['result']}")
+        print(f"Result: {result['result']}" + (" (cached)" if result.get("cached") else ""))
         print(f"Cost: {result['cost']}")
         print(f"Expanded Nodes: {result['expanded_nodes_qty']}")
+        if "heuristic_cache_hits" in result:
+            print(f"Heuristic Cache: {result['heuristic_cache_hits']} hits / {result['heuristic_cache_misses']} misses")
+        for check in ["freeze", "corral"]:
+            if f"{check}_pruned" in result:
+                print(f"Pruned by {check} check: {result[f'{check}_pruned']} pushes")
+        if "key_collisions" in result:
+            print(f"Zobrist key collisions: {result['key_collisions']}")
         print(f"Max Frontier Size: {result['frontier_nodes_qty']}")
         print(f"Solution: {result['solution'] if result['solution'] else 'No solution'}")
+        if "partial_solution" in result:
+            print(f"Best partial state (h={result['best_heuristic']}): {result['partial_solution'] or 'initial state'}")
         print(f"Duration: {result['duration']:.4f} seconds")
+        print(f"Memory per state: ~{result['state_size_bytes']} bytes")
+        for round_info in result.get("rounds", []):
+            print(f"  Depth limit {round_info['depth_limit']}: {round_info['expanded_nodes_qty']} expanded "
+                  f"in {round_info['duration']:.4f} seconds")
         print("==============================")
 
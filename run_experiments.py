@@ -1,50 +1,104 @@
 #!/usr/bin/env python3
-import subprocess
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from main import solve_board, get_heuristic_function, csv_row, limits_from_args, flag_value
+from utils.parser import parse_board_from_file
+from utils.solution_cache import SolutionCache
+
 # === Configuración ===
 BOARDS_DIR = Path("boards")
 RESULTS_DIR = Path("results")
+CSV_HEADER = "board,algorithm,heuristic,result,cost,expanded,frontier,duration_sec,solution,cached\n"
 
 ALGORITHMS_NO_HEURISTICS = ["bfs", "dfs", "iddfs"]
 ALGORITHMS_HEURISTICS = ["greedy", "astar"]
 
-HEURISTICS = ["manhattan", "euclidean", "linear_conflict", "manhattan_player"]
+HEURISTICS = ["manhattan", "euclidean", "linear_conflict", "manhattan_player", "hungarian", "push_distance", "push_distance_player"]
+
+REPETITIONS = 5  # v0 a v4
+USAGE = (f"Uso: {sys.argv[0]} [board1.txt ...] [--jobs N] [--reps N] [--output archivo.csv] "
+         f"[--time-limit SEG] [--max-nodes N] [--max-memory MB] [--cache]")
+
+# Tableros ya parseados por este proceso (cada worker parsea cada tablero una sola vez)
+_boards = {}
+# Conexión a la caché de soluciones de este proceso (None salvo que se corra con --cache)
+_solution_cache = None
+
+
+def _open_solution_cache():
+    global _solution_cache
+    _solution_cache = SolutionCache()
+
+
+def run_job(board_path, algorithm, heuristic, limits=(None, None, None)):
+    board = _boards.get(board_path)
+    if board is None:
+        board = _boards[board_path] = parse_board_from_file(board_path)
+    result = solve_board(board, algorithm, get_heuristic_function(heuristic), limits=limits_from_args(*limits),
+                         solution_cache=_solution_cache)
+    return csv_row(board_path, algorithm, heuristic, result)
 
-RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
-if len(sys.argv) < 2:
-    print(f"Uso: {sys.argv[0]} board1.txt [board2.txt ...]")
-    sys.exit(1)
+def jobs_for(board_paths, repetitions):
+    for _ in range(repetitions):
+        for board_path in board_paths:
+            for alg in ALGORITHMS_NO_HEURISTICS:
+                yield board_path, alg, "no_heuristic"
+            for alg in ALGORITHMS_HEURISTICS:
+                for heur in HEURISTICS:
+                    yield board_path, alg, heur
 
-for board_path in sys.argv[1:]:
-    board = Path(board_path)
-    board_name = board.stem
 
-    print(f"▶️ Ejecutando algoritmos para board: {board_name}")
+if __name__ == "__main__":
+    jobs = os.cpu_count()
+    repetitions = REPETITIONS
+    output = RESULTS_DIR / "results.csv"
+    board_paths = []
+    time_limit = max_nodes = max_memory_mb = None
+    use_cache = False  # las repeticiones tienen que medir corridas reales
 
-    for version in range(5):  # v0 a v4
-        csv_file = RESULTS_DIR / f"{board_name}_v{version}_results.csv"
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg == "--jobs":
+            jobs = flag_value(args, arg, int, USAGE)
+        elif arg == "--reps":
+            repetitions = flag_value(args, arg, int, USAGE)
+        elif arg == "--output":
+            output = flag_value(args, arg, Path, USAGE)
+        elif arg == "--time-limit":
+            time_limit = flag_value(args, arg, float, USAGE)
+        elif arg == "--max-nodes":
+            max_nodes = flag_value(args, arg, int, USAGE)
+        elif arg == "--max-memory":
+            max_memory_mb = flag_value(args, arg, float, USAGE)
+        elif arg == "--cache":
+            use_cache = True
+        elif arg in ("-h", "--help"):
+            print(USAGE)
+            sys.exit(0)
+        else:
+            board_paths.append(arg)
 
-        with csv_file.open("w") as f:
-            f.write("board,algorithm,heuristic,result,cost,expanded,frontier,duration_sec,solution\n")
+    # Sin tableros se corre el barrido completo sobre boards/
+    if not board_paths:
+        board_paths = [str(path) for path in sorted(BOARDS_DIR.glob("*.txt"))]
 
-        # Algoritmos sin heurística
-        for alg in ALGORITHMS_NO_HEURISTICS:
-            subprocess.run(
-                [sys.executable, "main.py", str(board), alg, "--csv"],
-                stdout=open(csv_file, "a"),
-                check=True
-            )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    pending = list(jobs_for(board_paths, repetitions))
+    print(f"▶️ Ejecutando {len(pending)} corridas sobre {len(board_paths)} tableros con {jobs} procesos")
 
-        # Algoritmos con heurística
-        for alg in ALGORITHMS_HEURISTICS:
-            for heur in HEURISTICS:
-                subprocess.run(
-                    [sys.executable, "main.py", str(board), alg, heur, "--csv"],
-                    stdout=open(csv_file, "a"),
-                    check=True
-                )
+    with output.open("w") as f, ProcessPoolExecutor(
+            max_workers=jobs, initializer=_open_solution_cache if use_cache else None) as pool:
+        f.write(CSV_HEADER)
+        limits = (time_limit, max_nodes, max_memory_mb)
+        futures = [pool.submit(run_job, *job, limits) for job in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            f.write(future.result() + "\n")
+            f.flush()
+            if done % 50 == 0:
+                print(f"  {done}/{len(futures)} corridas")
 
-        print(f"✅ Resultados v{version} guardados en {csv_file}")
+    print(f"✅ Resultados guardados en {output}")
@@ -6,13 +6,23 @@ RESULTS_DIR="results"
 ALGORITHMS_NO_HEURISTICS=("bfs" "dfs" "iddfs")
 ALGORITHMS_HEURISTICS=("greedy" "astar")
 
-HEURISTICS=("manhattan" "euclidean" "linear_conflict" "manhattan_player")
+HEURISTICS=("manhattan" "euclidean" "linear_conflict" "manhattan_player" "hungarian" "push_distance" "push_distance_player")
+
+# === Per-run limits (empty = no limit), e.g. TIME_LIMIT=60 ./run_experiments.sh boards/b1.txt ===
+TIME_LIMIT="${TIME_LIMIT:-}"
+MAX_NODES="${MAX_NODES:-}"
+MAX_MEMORY="${MAX_MEMORY:-}"
+
+LIMIT_ARGS=()
+[ -n "$TIME_LIMIT" ] && LIMIT_ARGS+=(--time-limit "$TIME_LIMIT")
+[ -n "$MAX_NODES" ] && LIMIT_ARGS+=(--max-nodes "$MAX_NODES")
+[ -n "$MAX_MEMORY" ] && LIMIT_ARGS+=(--max-memory "$MAX_MEMORY")
 
 # === Create folder if it does not already exists ===
 mkdir -p $RESULTS_DIR
 
 if [ $# -eq 0 ]; then
-    echo "Uso: $0 board1.txt [board2.txt ...]"
+    echo "Uso: [TIME_LIMIT=SEG] [MAX_NODES=N] [MAX_MEMORY=MB] $0 board1.txt [board2.txt ...]"
     exit 1
 fi
 
@@ -22,17 +32,17 @@ for board in "$@"; do
     csv_file="$RESULTS_DIR/${board_name}_results.csv"
 
     echo "▶️ Ejecutando algoritmos para board: $board_name"
-    echo "board,algorithm,heuristic,result,cost,expanded,frontier,duration_sec,solution" > $csv_file
+    echo "board,algorithm,heuristic,result,cost,expanded,frontier,duration_sec,solution,cached" > $csv_file
 
     # Without heuristic algorithms
     for alg in "${ALGORITHMS_NO_HEURISTICS[@]}"; do
-        python3 main.py "$board" "$alg" --csv >> $csv_file
+        python3 main.py "$board" "$alg" --csv --no-cache "${LIMIT_ARGS[@]}" >> $csv_file
     done
 
     # With heuristic algorithms
     for alg in "${ALGORITHMS_HEURISTICS[@]}"; do
         for heur in "${HEURISTICS[@]}"; do
-            python3 main.py "$board" "$alg" "$heur" --csv >> $csv_file
+            python3 main.py "$board" "$alg" "$heur" --csv --no-cache "${LIMIT_ARGS[@]}" >> $csv_file
         done
     done
 
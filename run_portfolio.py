@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+import multiprocessing
+import queue
+import sys
+import time
+
+from main import solve, get_heuristic_function, limits_from_args, flag_value
+
+# === Configuración ===
+# Cada configuración es "algoritmo" o "algoritmo:heurística"
+DEFAULT_PORTFOLIO = ["greedy:manhattan", "greedy:push_distance", "astar:linear_conflict", "astar:hungarian", "dfs"]
+# astar_parallel starts its own worker processes, which would be left running when a configuration is terminated
+UNSUPPORTED_ALGORITHMS = ["astar_parallel"]
+POLL_SECONDS = 1  # cada cuánto se revisa que las configuraciones sigan vivas mientras se espera
+USAGE = (f"Uso: {sys.argv[0]} board.txt [alg[:heur] ...] [--deadline SEG] [--time-limit SEG] [--max-nodes N] "
+         f"[--max-memory MB]")
+
+
+def _run_config(board_path, index, config, results, limits):
+    algorithm, _, heuristic = config.partition(":")
+    try:
+        result = solve(board_path, algorithm, get_heuristic_function(heuristic or "no_heuristic"),
+                       limits=limits_from_args(*limits), use_cache=False)
+    except Exception as e:
+        result = {"result": f"error: {e}", "cost": None, "solution": ""}
+    results.put((index, result))
+
+
+def run_portfolio(board_path, configs=DEFAULT_PORTFOLIO, deadline=None, limits=(None, None, None)):
+    """
+    Races several algorithm/heuristic configurations on one board, each in its
+    own process.
+
+    Without a deadline the first configuration that finds a solution wins and
+    the rest are terminated. With a deadline (seconds) the runner keeps waiting
+    until it expires or every configuration finishes, returns the cheapest
+    solution found, and terminates whatever is still running.
+
+    limits = (time_limit, max_nodes, max_memory_mb) is applied to every
+    configuration on its own (see utils.limits). The solution cache is not used,
+    so every configuration really runs and the race means something.
+
+    Configurations that fail (an exception, or a process that dies before
+    reporting, e.g. killed for running out of memory) are reported on stderr.
+
+    Returns (config, result), or (None, None) if no configuration solved it.
+    """
+    for config in configs:
+        algorithm = config.partition(":")[0]
+        if algorithm in UNSUPPORTED_ALGORITHMS:
+            raise ValueError(f"Algorithm {algorithm} can't run inside a portfolio")
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_run_config, args=(board_path, index, config, results, limits),
+                                         daemon=True)
+                 for index, config in enumerate(configs)]
+    for process in processes:
+        process.start()
+
+    start_time = time.time()
+    best_config, best = None, None
+    pending = set(range(len(processes)))  # configurations that haven't reported yet
+    try:
+        while pending:
+            timeout = POLL_SECONDS
+            if deadline is not None:
+                timeout = min(timeout, deadline - (time.time() - start_time))
+                if timeout <= 0:
+                    break
+            try:
+                index, result = results.get(timeout=timeout)
+            except queue.Empty:
+                # A process that exits normally has already posted its result, so only a crash is lost here
+                for index in list(pending):
+                    exitcode = processes[index].exitcode
+                    if exitcode is not None and exitcode != 0:
+                        pending.discard(index)
+                        print(f"⚠️ {configs[index]}: el proceso terminó con código {exitcode}", file=sys.stderr)
+                continue
+            pending.discard(index)
+            config = configs[index]
+            if result["result"].startswith("error"):
+                print(f"⚠️ {config}: {result['result']}", file=sys.stderr)
+            if result["result"] != "solved":
+                continue
+            if best is None or result["cost"] < best["cost"]:
+                best_config, best = config, result
+            if deadline is None:
+                break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    return best_config, best
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(USAGE)
+        sys.exit(1)
+
+    board_path = sys.argv[1]
+    configs = []
+    deadline = None
+    time_limit = max_nodes = max_memory_mb = None
+
+    args = iter(sys.argv[2:])
+    for arg in args:
+        if arg == "--deadline":
+            deadline = flag_value(args, arg, float, USAGE)
+        elif arg == "--time-limit":
+            time_limit = flag_value(args, arg, float, USAGE)
+        elif arg == "--max-nodes":
+            max_nodes = flag_value(args, arg, int, USAGE)
+        elif arg == "--max-memory":
+            max_memory_mb = flag_value(args, arg, float, USAGE)
+        else:
+            configs.append(arg)
+
+    start = time.time()
+    try:
+        config, result = run_portfolio(board_path, configs or DEFAULT_PORTFOLIO, deadline,
+                                       (time_limit, max_nodes, max_memory_mb))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = time.time() - start
+
+    if result is None:
+        print(f"❌ Ninguna configuración resolvió {board_path} ({elapsed:.4f} s)")
+        sys.exit(1)
+
+    print("=== Sokoban Portfolio Result ===")
+    print(f"Winner: {config}")
+    print(f"Cost: {result['cost']}")
+    print(f"Expanded Nodes: {result['expanded_nodes_qty']}")
+    print(f"Solution: {result['solution']}")
+    print(f"Solver Duration: {result['duration']:.4f} seconds")
+    print(f"Wall Time: {elapsed:.4f} seconds")
+    print("================================")
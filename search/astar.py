@@ -1,7 +1,10 @@
 from search import informed_search
 
 
-def solve_with_astar(initial_state, heuristic, goal_positions, board):
-    a_star_priority = lambda state, goals, g_val, walls: g_val + heuristic(state, goals, walls)
-    a_star_tie_breaker = lambda state, goals, walls: heuristic(state, goals, walls)
-    return informed_search.solve_informed_search(initial_state, a_star_priority, goal_positions, board, a_star_tie_breaker)
+def solve_with_astar(initial_state, heuristic, board, push_mode=False, cache_size=0, limits=None,
+                     verify_keys=False, deadlock_checks=None):
+    a_star_priority = lambda h_val, g_val: g_val + h_val
+    a_star_tie_breaker = lambda h_val: h_val
+    return informed_search.solve_informed_search(initial_state, heuristic, a_star_priority, board, a_star_tie_breaker, push_mode,
+                                                 cache_size, limits, verify_keys=verify_keys,
+                                                 deadlock_checks=deadlock_checks)
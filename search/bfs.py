@@ -1,58 +1,67 @@
 import time
 from collections import deque
-from utils.draw import  draw_sokoban
+from state import pushes_to_moves
+from utils.limits import limit_result
+from utils.search_tree import SearchTree
 
-def solve_with_bfs(initial_state,walls,goal_positions):
+def solve_with_bfs(initial_state, board, push_mode=False, limits=None, verify_keys=False, deadlock_checks=None):
     start_time = time.time()
+    if limits is not None:
+        limits.start()
 
-    frontier = deque([initial_state])  # BFS uses a queue
-    came_from = {initial_state: (None, None)}  # Store parent state only
-    visited = set()
+    # In push mode each node is a box configuration with a normalized player
+    start_state = initial_state.normalized(board) if push_mode else initial_state
+
+    # Parents and actions live in the compact search tree; the queue holds (state, node id)
+    tree = SearchTree(board, push_mode, verify_keys)
+    frontier = deque([(start_state, tree.add(start_state))])  # BFS uses a queue
     expanded_nodes_qty = 0
 
     while frontier:
-        current_state = frontier.popleft()
-        # draw_sokoban(walls, current_state.boxes, goal_positions, current_state.player)
-        if current_state in visited:
-            continue
-        visited.add(current_state)
+        current_state, node = frontier.popleft()
+        # from utils.draw import draw_sokoban  (matplotlib, solo para debug)
+        # draw_sokoban(board.walls, current_state.boxes, board.goal_positions, current_state.player)
 
         expanded_nodes_qty += 1
 
-        # if len(visited)% 100000 == 0:
-        #     print(f"Expanded nodes: {len(visited)} and frontier size: {len(frontier)}")
+        # if expanded_nodes_qty % 100000 == 0:
+        #     print(f"Expanded nodes: {expanded_nodes_qty} and frontier size: {len(frontier)}")
 
-        if current_state.is_goal_state(goal_positions):
+        if current_state.is_goal_state(board):
             # Reconstruct solution path
-            moves = []
-            state = current_state
-            while came_from[state][0] is not None:
-                parent, action = came_from[state]
-                moves.append(action)
-                state = parent
-            moves.reverse()
+            moves = tree.path(node)
+            solution = pushes_to_moves(board, initial_state, moves) if push_mode else "".join(moves)
 
             end_time = time.time()
-            return {
+            return tree.with_collisions({
                 "result": "solved",
-                "cost": len(moves),
+                "cost": len(solution),
                 "expanded_nodes_qty": expanded_nodes_qty,
                 "frontier_nodes_qty": len(frontier),
-                "solution": "".join(moves),
+                "solution": solution,
                 "duration": end_time - start_time
-            }
+            })
+
+        if limits is not None:
+            reason = limits.check(expanded_nodes_qty)
+            if reason is not None:
+                return tree.with_collisions(limit_result(reason, expanded_nodes_qty, len(frontier), start_time))
+
+        if push_mode:
+            successors = current_state.get_possible_pushes(board, deadlock_checks)
+        else:
+            successors = current_state.get_possible_moves(board, deadlock_checks)
 
-        for action, neighbor in current_state.get_possible_moves(walls,goal_positions):
-            if neighbor not in came_from:  # not discovered before
-                came_from[neighbor] = (current_state, action)
-                frontier.append(neighbor)
+        for action, neighbor in successors:
+            if neighbor not in tree:  # not discovered before
+                frontier.append((neighbor, tree.add(neighbor, node, action)))
 
     end_time = time.time()
-    return {
+    return tree.with_collisions({
         "result": "no solution",
         "cost": None,
         "expanded_nodes_qty": expanded_nodes_qty,
         "frontier_nodes_qty": len(frontier),
         "solution": "",
         "duration": end_time - start_time
-    }
+    })
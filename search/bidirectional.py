@@ -0,0 +1,116 @@
+import time
+from collections import deque
+from state import State, directions, pushes_to_moves
+from utils.limits import limit_result
+
+opposite = {"U": "D", "D": "U", "L": "R", "R": "L"}
+
+
+def goal_states(board):
+    """
+    Every solved configuration the backward search can start from: boxes on the
+    goals and the (normalized) player in each separate area of free floor.
+    """
+    states = []
+    free = set(board.floor - board.goal_positions)
+    while free:
+        state = State(next(iter(free)), board.goal_positions, board)
+        reachable = state.reachable_cells(board)
+        free -= reachable
+        states.append(state.normalized(board, reachable))
+    return states
+
+
+def solve_with_bidirectional(initial_state, board, limits=None, deadlock_checks=None):
+    """
+    Bidirectional breadth-first search at push level.
+
+    One frontier grows forward from the initial state with box pushes and the
+    other backwards from the goal configurations with pulls (the reverse
+    moves). Both sides use normalized player positions, so they meet as soon as
+    a state is reached from both; the side with the smaller frontier is the one
+    expanded at each step. The pushes of both halves are then expanded into the
+    full U/D/L/R move string.
+    """
+    start_time = time.time()
+    if limits is not None:
+        limits.start()
+
+    start_state = initial_state.normalized(board)
+    forward = {start_state: (None, None)}  # state -> (parent, push)
+    backward = {}  # state -> (state closer to the goal, pull that led here from it)
+    forward_frontier = deque([start_state])
+    backward_frontier = deque()
+    for state in goal_states(board):
+        backward[state] = (None, None)
+        backward_frontier.append(state)
+    expanded_nodes_qty = 0
+
+    meeting = start_state if start_state in backward else None
+
+    while meeting is None and forward_frontier and backward_frontier:
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        frontier, seen, other = (forward_frontier, forward, backward) if expand_forward \
+            else (backward_frontier, backward, forward)
+
+        # Expand one whole layer of the chosen side
+        for _ in range(len(frontier)):
+            current_state = frontier.popleft()
+            expanded_nodes_qty += 1
+            if limits is not None:
+                reason = limits.check(expanded_nodes_qty)
+                if reason is not None:
+                    return limit_result(reason, expanded_nodes_qty, len(forward_frontier) + len(backward_frontier),
+                                        start_time)
+            if expand_forward:
+                successors = current_state.get_possible_pushes(board, deadlock_checks)
+            else:
+                successors = current_state.get_possible_pulls(board)
+
+            for action, neighbor in successors:
+                if neighbor in seen:
+                    continue
+                seen[neighbor] = (current_state, action)
+                frontier.append(neighbor)
+                if neighbor in other:
+                    meeting = neighbor
+                    break
+            if meeting is not None:
+                break
+
+    end_time = time.time()
+    if meeting is None:
+        return {
+            "result": "no solution",
+            "cost": None,
+            "expanded_nodes_qty": expanded_nodes_qty,
+            "frontier_nodes_qty": len(forward_frontier) + len(backward_frontier),
+            "solution": "",
+            "duration": end_time - start_time
+        }
+
+    # Forward half: pushes from the start to the meeting state
+    pushes = []
+    state = meeting
+    while forward[state][0] is not None:
+        state, push = forward[state]
+        pushes.append(push)
+    pushes.reverse()
+
+    # Backward half: undo every pull, from the meeting state to the goal
+    state = meeting
+    while backward[state][0] is not None:
+        state, (box, action) = backward[state]
+        di, dj = directions[action]
+        pushes.append(((box[0] + di, box[1] + dj), opposite[action]))
+
+    solution = pushes_to_moves(board, initial_state, pushes)
+    end_time = time.time()
+    return {
+        "result": "solved",
+        "cost": len(solution),
+        "expanded_nodes_qty": expanded_nodes_qty,
+        "frontier_nodes_qty": len(forward_frontier) + len(backward_frontier),
+        "solution": solution,
+        "duration": end_time - start_time
+    }
@@ -1,52 +1,49 @@
 import time
+from utils.limits import limit_result
+from utils.search_tree import SearchTree
 
-def solve_with_dfs(initial_state,walls,goal_positions):
+def solve_with_dfs(initial_state, board, limits=None, verify_keys=False, deadlock_checks=None):
     start_time = time.time()
+    if limits is not None:
+        limits.start()
 
-    stack = [initial_state]
-    came_from = {initial_state: (None, None)}  # (parent, action)
-    visited = set()
+    tree = SearchTree(board, verify=verify_keys)  # parent ids and actions, see utils/search_tree.py
+    stack = [(initial_state, tree.add(initial_state))]
     expanded_nodes_qty = 0
 
     while stack:
-        current_state = stack.pop()
-
-        if current_state in visited:
-            continue
-        visited.add(current_state)
+        current_state, node = stack.pop()
 
         expanded_nodes_qty += 1
 
-        if current_state.is_goal_state(goal_positions):
-            moves = []
-            state = current_state
-            while came_from[state][0] is not None:
-                parent, action = came_from[state]
-                moves.append(action)
-                state = parent
-            moves.reverse()
+        if current_state.is_goal_state(board):
+            moves = tree.path(node)
 
             end_time = time.time()
-            return {
+            return tree.with_collisions({
                 "result": "solved",
                 "cost": len(moves),
                 "expanded_nodes_qty": expanded_nodes_qty,
                 "frontier_nodes_qty": len(stack),
                 "solution": "".join(moves),
                 "duration": end_time - start_time
-            }
+            })
+
+        if limits is not None:
+            reason = limits.check(expanded_nodes_qty)
+            if reason is not None:
+                return tree.with_collisions(limit_result(reason, expanded_nodes_qty, len(stack), start_time))
 
-        for action, neighbor in current_state.get_possible_moves(walls,goal_positions):
-            if neighbor not in came_from:
-                came_from[neighbor] = (current_state, action)
-                stack.append(neighbor)
+        for action, neighbor in current_state.get_possible_moves(board, deadlock_checks):
+            if neighbor not in tree:
+                stack.append((neighbor, tree.add(neighbor, node, action)))
 
     end_time = time.time()
-    return {
+    return tree.with_collisions({
         "result": "no solution",
         "cost": None,
         "expanded_nodes_qty": expanded_nodes_qty,
         "frontier_nodes_qty": len(stack),
         "solution": "",
         "duration": end_time - start_time
-    }
+    })
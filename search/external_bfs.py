@@ -0,0 +1,195 @@
+import heapq
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from state import State
+from utils.limits import limit_result
+
+CHUNK_SIZE = 100_000  # states decoded / generated per in-memory batch
+
+
+def solve_with_external_bfs(initial_state, board, work_dir=None, chunk_size=CHUNK_SIZE, limits=None,
+                            deadlock_checks=None):
+    """
+    Breadth-first search with its layers on disk (external-memory BFS).
+
+    Every state is packed into a fixed-width byte record (player cell and sorted
+    box cells as big-endian uint16), so records sort the same way as their
+    values. Each depth layer is a file of sorted, unique records, read back
+    through np.memmap:
+
+    1. The layer is expanded chunk by chunk. Each chunk's successors are sorted,
+       deduplicated and written as a run file.
+    2. The runs are merged, and every merged chunk is checked with searchsorted
+       against all earlier layers (Sokoban moves are not all reversible, so a
+       state may reappear from any depth). What's left becomes the next layer.
+    3. Once a goal appears, the path is rebuilt walking back one layer at a
+       time, looking in each for a state that has the current one as a successor.
+
+    Only chunk_size states (plus the merge buffers) are in memory at once, so
+    the state space can be larger than RAM. Files go to work_dir (a temporary
+    directory by default) and are deleted at the end.
+    """
+    start_time = time.time()
+    if limits is not None:
+        limits.start()
+
+    codec = _RecordCodec(board, len(initial_state.boxes))
+    own_dir = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix="sokoban_bfs_") if own_dir else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+
+    try:
+        layers = [os.path.join(work_dir, "layer_0.bin")]
+        codec.encode([initial_state]).tofile(layers[0])
+        expanded_nodes_qty = 0
+        goal_depth = goal_record = None
+        depth = 0
+
+        while goal_record is None:
+            layer = codec.load(layers[depth])
+            if len(layer) == 0:
+                break
+
+            # 1. Expand the layer into sorted runs of successors
+            runs = []
+            for start in range(0, len(layer), chunk_size):
+                successors = []
+                for state in codec.decode(layer[start:start + chunk_size]):
+                    expanded_nodes_qty += 1
+                    if state.is_goal_state(board):
+                        goal_depth, goal_record = depth, codec.encode([state])[0]
+                        break
+                    if limits is not None:
+                        reason = limits.check(expanded_nodes_qty)
+                        if reason is not None:
+                            return limit_result(reason, expanded_nodes_qty, len(layer), start_time)
+                    successors.extend(neighbor for _, neighbor in state.get_possible_moves(board, deadlock_checks))
+                if goal_record is not None:
+                    break
+                if successors:
+                    run_path = os.path.join(work_dir, f"run_{depth + 1}_{len(runs)}.bin")
+                    np.unique(codec.encode(successors)).tofile(run_path)
+                    runs.append(run_path)
+            if goal_record is not None:
+                break
+
+            # 2. Merge the runs and drop the states already seen in earlier layers
+            next_path = os.path.join(work_dir, f"layer_{depth + 1}.bin")
+            with open(next_path, "wb") as out:
+                for merged in _merge_runs([codec.load(run) for run in runs], codec, chunk_size):
+                    for earlier in layers:
+                        merged = _without(merged, codec.load(earlier))
+                        if len(merged) == 0:
+                            break
+                    merged.tofile(out)
+            for run in runs:
+                os.remove(run)
+            layers.append(next_path)
+            depth += 1
+
+        frontier_nodes_qty = len(codec.load(layers[-1]))
+        if goal_record is None:
+            end_time = time.time()
+            return {
+                "result": "no solution",
+                "cost": None,
+                "expanded_nodes_qty": expanded_nodes_qty,
+                "frontier_nodes_qty": frontier_nodes_qty,
+                "solution": "",
+                "duration": end_time - start_time
+            }
+
+        # 3. Walk back through the layer files to rebuild the moves
+        moves = []
+        target = goal_record
+        for depth in range(goal_depth - 1, -1, -1):
+            action, target = _find_parent(codec.load(layers[depth]), target, codec, board, chunk_size)
+            moves.append(action)
+        moves.reverse()
+
+        end_time = time.time()
+        return {
+            "result": "solved",
+            "cost": len(moves),
+            "expanded_nodes_qty": expanded_nodes_qty,
+            "frontier_nodes_qty": frontier_nodes_qty,
+            "solution": "".join(moves),
+            "duration": end_time - start_time
+        }
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class _RecordCodec:
+    """Packs states into fixed-width 'S' records and back."""
+
+    def __init__(self, board, n_boxes):
+        self.board = board
+        self.width = n_boxes + 1
+        self.dtype = np.dtype(f"S{2 * self.width}")
+
+    def encode(self, states):
+        cells = np.array([[self.board.index(state.player)] + sorted(self.board.index(box) for box in state.boxes)
+                          for state in states], dtype=">u2")
+        return cells.reshape(len(states), self.width).view(self.dtype).ravel()
+
+    def decode(self, records):
+        board = self.board
+        cells = np.frombuffer(np.ascontiguousarray(records).tobytes(), dtype=">u2").reshape(-1, self.width)
+        for row in cells.tolist():
+            yield State(board.position(row[0]), [board.position(idx) for idx in row[1:]], board)
+
+    def load(self, path):
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode="r")
+
+
+def _merge_runs(runs, codec, chunk_size):
+    """K-way merge of sorted runs, yielding sorted unique chunks of records."""
+    if len(runs) == 1:
+        for start in range(0, len(runs[0]), chunk_size):
+            yield np.array(runs[0][start:start + chunk_size])
+        return
+
+    def records(run):
+        for start in range(0, len(run), chunk_size):
+            yield from np.array(run[start:start + chunk_size]).tolist()
+
+    buffer = []
+    last = None
+    for record in heapq.merge(*(records(run) for run in runs)):
+        if record == last:
+            continue
+        last = record
+        buffer.append(record)
+        if len(buffer) == chunk_size:
+            yield np.array(buffer, dtype=codec.dtype)
+            buffer = []
+    if buffer:
+        yield np.array(buffer, dtype=codec.dtype)
+
+
+def _without(candidates, layer):
+    """Sorted candidates that are not in the (sorted) layer."""
+    if len(layer) == 0:
+        return candidates
+    positions = np.searchsorted(layer, candidates)
+    found = positions < len(layer)
+    found[found] = layer[positions[found]] == candidates[found]
+    return candidates[~found]
+
+
+def _find_parent(layer, target, codec, board, chunk_size):
+    """A state in the layer with a move leading to target: returns (action, parent record)."""
+    for start in range(0, len(layer), chunk_size):
+        chunk = layer[start:start + chunk_size]
+        for record, state in zip(chunk, codec.decode(chunk)):
+            for action, neighbor in state.get_possible_moves(board):
+                if codec.encode([neighbor])[0] == target:
+                    return action, record
+    raise RuntimeError("Broken layer files: no parent found for a state")
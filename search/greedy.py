@@ -1,6 +1,9 @@
 from search import informed_search
 
 
-def solve_with_greedy(initial_state, heuristic, goal_positions, board):
-    greedy_priority = lambda state, goals, g_val, walls: heuristic(state, goals, walls)
-    return informed_search.solve_informed_search(initial_state, greedy_priority, goal_positions, board, None)
\ No newline at end of file
+def solve_with_greedy(initial_state, heuristic, board, push_mode=False, cache_size=0, limits=None,
+                      verify_keys=False, deadlock_checks=None):
+    greedy_priority = lambda h_val, g_val: h_val
+    return informed_search.solve_informed_search(initial_state, heuristic, greedy_priority, board, None, push_mode,
+                                                 cache_size, limits, reopen=False, verify_keys=verify_keys,
+                                                 deadlock_checks=deadlock_checks)
\ No newline at end of file
@@ -0,0 +1,127 @@
+import time
+from utils.limits import limit_result
+from utils.zobrist import KeyMap
+
+
+def solve_with_idastar(initial_state, heuristic, board, transposition_size=0, limits=None, verify_keys=False,
+                       deadlock_checks=None):
+    """
+    Iterative-deepening A*.
+
+    Runs depth-first searches bounded by f = g + h, raising the bound to the
+    smallest f that exceeded it on the previous iteration. The search uses an
+    explicit stack (no recursion limit) and only keeps the current path in
+    memory, so memory is linear in the solution depth.
+
+    With transposition_size > 0 a transposition table of at most that many
+    Zobrist keys remembers the smallest g each state was reached with during
+    the current iteration, and prunes later visits that arrive with a g that
+    is not better. With verify_keys the table also keeps the states and
+    compares them on every hit (see utils.zobrist.KeyMap); the key collisions
+    found are reported as key_collisions.
+    """
+    start_time = time.time()
+    if limits is not None:
+        limits.start()
+    expanded_nodes_qty = 0
+    stopped = None  # limit that stopped the search, if any
+    key_collisions = 0
+
+    def search(bound):
+        nonlocal expanded_nodes_qty, stopped, key_collisions
+        next_bound = float('inf')
+        table = KeyMap(verify_keys) if transposition_size > 0 else None
+
+        # Each frame: (state, g, iterator over its successors, the heuristic's data for the state)
+        stack = [(initial_state, 0, iter(initial_state.get_possible_moves(board, deadlock_checks)), start_data)]
+        on_path = {initial_state}
+        actions = []
+        expanded_nodes_qty += 1
+
+        while stack:
+            state, g_val, children, data = stack[-1]
+            step = next(children, None)
+            if step is None:
+                stack.pop()
+                on_path.discard(state)
+                if actions:
+                    actions.pop()
+                continue
+
+            action, child = step
+            if child in on_path:
+                continue
+
+            g_child = g_val + 1
+            if table is not None:
+                seen = table.get(child)
+                if seen is not None and seen <= g_child:
+                    continue
+                if seen is not None or len(table) < transposition_size:
+                    table[child] = g_child
+
+            if incremental:
+                h_child, child_data = heuristic.incremental(child, board, data)
+            else:
+                h_child, child_data = heuristic(child, board), None
+            f_child = g_child + h_child
+            if f_child > bound:
+                next_bound = min(next_bound, f_child)
+                continue
+
+            actions.append(action)
+            if child.is_goal_state(board):
+                key_collisions += table.collisions if table is not None else 0
+                return actions, len(stack), next_bound
+
+            expanded_nodes_qty += 1
+            if limits is not None:
+                stopped = limits.check(expanded_nodes_qty)
+                if stopped is not None:
+                    key_collisions += table.collisions if table is not None else 0
+                    return None, len(stack), float('inf')
+            on_path.add(child)
+            stack.append((child, g_child, iter(child.get_possible_moves(board, deadlock_checks)), child_data))
+
+        key_collisions += table.collisions if table is not None else 0
+        return None, 0, next_bound
+
+    # Heuristics with an incremental version evaluate each child from its parent's data (kept in the frame)
+    incremental = getattr(heuristic, "incremental", None) is not None
+    start_data = None
+    if initial_state.is_goal_state(board):
+        moves, frontier_nodes_qty, bound = [], 0, float('inf')
+    else:
+        moves, frontier_nodes_qty = None, 0
+        if incremental:
+            bound, start_data = heuristic.incremental(initial_state, board, None)
+        else:
+            bound = heuristic(initial_state, board)
+
+    while moves is None and bound != float('inf'):
+        moves, frontier_nodes_qty, bound = search(bound)
+
+    end_time = time.time()
+    if stopped is not None:
+        result = limit_result(stopped, expanded_nodes_qty, frontier_nodes_qty, start_time)
+    elif moves is None:
+        result = {
+            "result": "no solution",
+            "cost": None,
+            "expanded_nodes_qty": expanded_nodes_qty,
+            "frontier_nodes_qty": 0,
+            "solution": "",
+            "duration": end_time - start_time
+        }
+    else:
+        result = {
+            "result": "solved",
+            "cost": len(moves),
+            "expanded_nodes_qty": expanded_nodes_qty,
+            "frontier_nodes_qty": frontier_nodes_qty,
+            "solution": "".join(moves),
+            "duration": end_time - start_time
+        }
+    if verify_keys:
+        result["key_collisions"] = key_collisions
+    return result
@@ -1,66 +1,85 @@
 import time
+from utils.limits import limit_result
 
-def solve_with_iddfs(initial_state, walls, goals_positions , depth_step=10):
+def solve_with_iddfs(initial_state, board, depth_step=10, limits=None, deadlock_checks=None):
+    """
+    Iterative deepening DFS with an explicit stack (no recursion limit).
+
+    A table shared by every deepening round keeps, for each state, the shallowest
+    depth it has been reached at and the round that last expanded it there. A
+    state reached deeper than that depth is skipped (the shallower path covers
+    it), but a state reached through a shorter path is expanded again, and each
+    state is expanded at most once per round at its best depth.
+
+    The result includes the time and expanded nodes of every round.
+    """
     start_time = time.time()
+    if limits is not None:
+        limits.start()
     expanded_nodes_qty = 0
-
-    # AUX: Depth-Limited Search (DLS)
-    def dls(state, depth, came_from, visited, frontier_nodes):
-        nonlocal expanded_nodes_qty
-        if state in visited:
-            return False, None
-        visited.add(state)
-        expanded_nodes_qty += 1
-        if state.is_goal_state(goals_positions):
-            return True, state
-        if depth == 0:
-            frontier_nodes.add(state)
-            return True, None
-        any_frontier = False
-        for action, neighbor in state.get_possible_moves(walls, goals_positions):
-            if neighbor not in came_from:
-                came_from[neighbor] = (state, action)
-                reached_frontier, result = dls(neighbor, depth - 1, came_from, visited, frontier_nodes)
-                if result is not None:
-                    return True, result
-                if reached_frontier:
-                    any_frontier = True
-        return any_frontier, None
+    best_depth = {}  # state -> (shallowest depth, round it was last expanded at that depth)
+    rounds = []
 
     depth_limit = depth_step
+    round_number = 0
     while True:
-        came_from = {initial_state: (None, None)}
-        visited = set()
-        frontier_nodes = set()
-        reached_frontier, result_state = dls(initial_state, depth_limit, came_from, visited, frontier_nodes)
-        frontier_nodes_qty = len(frontier_nodes)
-        if result_state is not None:
-            moves = []
-            state = result_state
-            while came_from[state][0] is not None:
-                parent, _ = came_from[state]
-                dr = state.player[0] - parent.player[0]
-                dc = state.player[1] - parent.player[1]
-                if dr == -1 and dc == 0:
-                    moves.append("U")
-                elif dr == 1 and dc == 0:
-                    moves.append("D")
-                elif dr == 0 and dc == -1:
-                    moves.append("L")
-                elif dr == 0 and dc == 1:
-                    moves.append("R")
-                state = parent
-            moves.reverse()
+        round_start = time.time()
+        round_expanded = 0
+        frontier_nodes_qty = 0
+        result_moves = None
+
+        # Explicit DFS stack of (action, state, depth); actions holds the moves of the current path
+        actions = []
+        pending = [(None, initial_state, 0)]
+
+        while pending and result_moves is None:
+            action, state, depth = pending.pop()
+
+            seen = best_depth.get(state)
+            if seen is not None and (seen[0] < depth or (seen[0] == depth and seen[1] == round_number)):
+                continue
+            best_depth[state] = (depth, round_number)
+
+            # Unwind the path back to this state's parent and step into it
+            if action is not None:
+                del actions[depth - 1:]
+                actions.append(action)
+
+            expanded_nodes_qty += 1
+            round_expanded += 1
+
+            if state.is_goal_state(board):
+                result_moves = list(actions)
+            elif depth == depth_limit:
+                frontier_nodes_qty += 1
+            else:
+                if limits is not None:
+                    reason = limits.check(expanded_nodes_qty)
+                    if reason is not None:
+                        result = limit_result(reason, expanded_nodes_qty, len(pending), start_time)
+                        result["rounds"] = rounds
+                        return result
+                for child_action, neighbor in reversed(state.get_possible_moves(board, deadlock_checks)):
+                    pending.append((child_action, neighbor, depth + 1))
+
+        rounds.append({
+            "depth_limit": depth_limit,
+            "expanded_nodes_qty": round_expanded,
+            "duration": time.time() - round_start
+        })
+
+        if result_moves is not None:
             end_time = time.time()
             return {
                 "result": "solved",
-                "cost": len(moves),
+                "cost": len(result_moves),
                 "expanded_nodes_qty": expanded_nodes_qty,
                 "frontier_nodes_qty": frontier_nodes_qty,
-                "solution": "".join(moves),
-                "duration": end_time - start_time
+                "solution": "".join(result_moves),
+                "duration": end_time - start_time,
+                "rounds": rounds
             }
-        if not reached_frontier:
+        if frontier_nodes_qty == 0:
             end_time = time.time()
             return {
                 "result": "no solution",
@@ -68,6 +87,8 @@ def solve_with_iddfs(initial_state, walls, goals_positions , depth_step=10):
                 "expanded_nodes_qty": expanded_nodes_qty,
                 "frontier_nodes_qty": frontier_nodes_qty,
                 "solution": "",
-                "duration": end_time - start_time
+                "duration": end_time - start_time,
+                "rounds": rounds
             }
         depth_limit += depth_step
+        round_number += 1
@@ -1,76 +1,238 @@
-import heapq
 import itertools
+from array import array
 import time
+import numpy as np
+from state import pushes_to_moves
+from utils.heuristic_cache import HeuristicCache
+from utils.limits import limit_result
+from utils.priority_queue import LazyHeap, BucketQueue
+from utils.search_tree import SearchTree
 
-def solve_informed_search(initial_state, priority_function, goal_positions, board, tiebreaker_function):
+
+def evaluate_heuristic(heuristic, states, board, cache=None, parent=None):
+    """
+    Heuristic values for a list of states.
+
+    parent is the (state, h) of the node the states were expanded from: for
+    heuristics that don't use the player, successors that only moved the player
+    have the same boxes and get the parent's h without evaluating it again.
+    If a cache is given, states whose box configuration was already evaluated
+    are answered from it and only the misses are computed. If the heuristic
+    provides a `batch` implementation and there are at least its
+    `batch_min_states` states (2 by default), those are evaluated in a single
+    vectorized call over their box (and player) cells.
+    """
+    if parent is not None and not getattr(heuristic, "uses_player", False):
+        parent_state, parent_h = parent
+        parent_boxes = parent_state.boxes_key()
+        values = [parent_h if state.boxes_key() == parent_boxes else None for state in states]
+        missing = [i for i, value in enumerate(values) if value is None]
+        computed = evaluate_heuristic(heuristic, [states[i] for i in missing], board, cache)
+        for i, value in zip(missing, computed):
+            values[i] = value
+        return values
+
+    if cache is not None:
+        values = [cache.get(state.boxes_key()) for state in states]
+        missing = [i for i, value in enumerate(values) if value is None]
+        computed = evaluate_heuristic(heuristic, [states[i] for i in missing], board)
+        for i, value in zip(missing, computed):
+            values[i] = value
+            cache.put(states[i].boxes_key(), value)
+        return values
+
+    batch = getattr(heuristic, "batch", None)
+    if batch is None or len(states) < getattr(heuristic, "batch_min_states", 2):
+        return [heuristic(state, board) for state in states]
+
+    box_cells = np.array([state.box_cells(board) for state in states])
+    player_cells = np.array([board.index(state.player) for state in states])
+    values = batch(box_cells, player_cells, board).tolist()
+    if not getattr(heuristic, "integer_valued", False):
+        return values
+    # numpy gives floats; integer heuristics go back to ints like their scalar version returns
+    return [h if h == float('inf') else int(h) for h in values]
+
+
+def evaluate_incremental(heuristic, states, board, parent_data, cache=None):
+    """
+    Same as evaluate_heuristic for heuristics with an `incremental` version: each
+    state is evaluated from its parent's data, and the per-state data is returned
+    too, as (values, data). Cache hits have no data (None).
+    """
+    values, data = [], []
+    for state in states:
+        value = cache.get(state.boxes_key()) if cache is not None else None
+        state_data = None
+        if value is None:
+            value, state_data = heuristic.incremental(state, board, parent_data)
+            if cache is not None:
+                cache.put(state.boxes_key(), value)
+        values.append(value)
+        data.append(state_data)
+    return values, data
+
+
+def solve_informed_search(initial_state, heuristic, priority_function, board, tiebreaker_function, push_mode=False,
+                          cache_size=0, limits=None, reopen=True, verify_keys=False,
+                          deadlock_checks=None):
+    """
+    Best-first search shared by greedy and A*.
+
+    The heuristic is evaluated once per discovered state (batched when possible),
+    then priority_function(h, g) and tiebreaker_function(h) order the frontier.
+    The frontier counts each open state once: when a cheaper path to a state is
+    found its g is updated and it is queued again at the new priority (the old
+    entry goes stale), and with reopen=True a state that was already expanded is
+    reopened, so A* stays optimal with inconsistent heuristics. The open list is
+    a heapq with lazy deletion, or for heuristics marked integer_valued a bucket
+    queue indexed by (priority, tie breaker).
+    With cache_size > 0 heuristic values are memoized by box configuration in a
+    bounded LRU cache (ignored for heuristics that depend on the player).
+    verify_keys makes the search tree compare states on key hits (see
+    utils.search_tree.SearchTree) and adds key_collisions to the result.
+    Heuristics with an `incremental` version keep their data (e.g. the box-goal
+    matching) for every open node, and its children are evaluated from it.
+
+    If the search is stopped by its limits, the result also carries the expanded
+    state with the lowest heuristic value (best_state / best_heuristic) and the
+    moves that reach it (partial_solution).
+    """
     start_time = time.time()
+    if limits is not None:
+        limits.start()
     counter = itertools.count()  # contador global para romper empates
 
-    frontier = []
-    tie_breaker = 0
-    if tiebreaker_function:
-        tie_breaker = tiebreaker_function(initial_state, goal_positions, board)
+    cache = None
+    if cache_size > 0 and not getattr(heuristic, "uses_player", False):
+        cache = HeuristicCache(cache_size)
+
+    # In push mode each node is a box configuration with a normalized player
+    start_state = initial_state.normalized(board) if push_mode else initial_state
 
-    heapq.heappush(frontier, (priority_function(initial_state, goal_positions, 0, board), tie_breaker,next(counter), initial_state, 0))
-    came_from = {initial_state: (None, None)}
-    visited = set()
+    incremental = getattr(heuristic, "incremental", None) is not None
+    node_data = {}  # open node id -> the heuristic's data for it (incremental heuristics only)
+    if incremental:
+        (h_start,), (start_data,) = evaluate_incremental(heuristic, [start_state], board, None, cache)
+    else:
+        h_start = evaluate_heuristic(heuristic, [start_state], board, cache)[0]
+
+    # Integer f-values: FIFO buckets per priority (O(1) within a bucket, O(log k) for the
+    # k distinct priorities in use), no need for the counter to order equal entries
+    use_buckets = getattr(heuristic, "integer_valued", False)
+
+    def entry_priority(h, g):
+        tie_breaker = 0
+        if tiebreaker_function:
+            tie_breaker = tiebreaker_function(h)
+        if use_buckets:
+            return priority_function(h, g), tie_breaker
+        return priority_function(h, g), tie_breaker, next(counter)
+
+    # Parent ids, actions, g and h of every discovered state live in typed columns indexed by node id.
+    # Only open states are kept as objects; each counts once on the open list, and a cheaper path requeues it.
+    tree = SearchTree(board, push_mode, verify_keys)
+    g_values = array('q')
+    h_values = array('d')
+    open_states = {}  # node id -> state
+
+    def add_node(state, parent, action, g, h):
+        node = tree.add(state, parent, action)
+        g_values.append(g)
+        h_values.append(h)
+        return node
+
+    start_node = add_node(start_state, -1, None, 0, h_start)
+    frontier = BucketQueue() if use_buckets else LazyHeap()
+    frontier.push(start_node, entry_priority(h_start, 0))
+    open_states[start_node] = start_state
+    if incremental:
+        node_data[start_node] = start_data
     expanded_nodes_qty = 0
+    best_node, best_state, best_h = start_node, start_state, h_start  # closest expanded state to the goal, for partial results
 
-    while frontier:
-        h_val, tie_breaker, _, current_state, g_val = heapq.heappop(frontier)
+    def path_to(node):
+        moves = tree.path(node)
+        return pushes_to_moves(board, initial_state, moves) if push_mode else "".join(moves)
 
-        if current_state in visited:
-            continue
-        visited.add(current_state)
+    while frontier:
+        node, _ = frontier.pop()
+        current_state = open_states.pop(node)
+        parent_data = node_data.pop(node, None)
+        g_val, h_val = g_values[node], h_values[node]
         expanded_nodes_qty += 1
+        if h_val < best_h:
+            best_node, best_state, best_h = node, current_state, h_val
 
-        if current_state.is_goal_state(goal_positions):
+        if current_state.is_goal_state(board):
             # Reconstruct solution path
-            moves = []
-            state = current_state
-            while came_from[state][0] is not None:
-                parent, action = came_from[state]
-                # Compare player positions to infer the move
-                dr = state.player[0] - parent.player[0]
-                dc = state.player[1] - parent.player[1]
-                if dr == -1 and dc == 0:
-                    moves.append("U")
-                elif dr == 1 and dc == 0:
-                    moves.append("D")
-                elif dr == 0 and dc == -1:
-                    moves.append("L")
-                elif dr == 0 and dc == 1:
-                    moves.append("R")
-                state = parent
-            moves.reverse()
+            solution = path_to(node)
 
             end_time = time.time()
-            return {
+            return tree.with_collisions({
                 "result": "solved",
-                "cost": len(moves),
+                "cost": len(solution),
                 "expanded_nodes_qty": expanded_nodes_qty,
+                "heuristic_cache_hits": cache.hits if cache else 0,
+                "heuristic_cache_misses": cache.misses if cache else 0,
                 "frontier_nodes_qty": len(frontier),
-                "solution": "".join(moves),
+                "solution": solution,
                 "duration": end_time - start_time
-            }
-
-        for action, neighbor in current_state.get_possible_moves(board, goal_positions):
-            if neighbor not in came_from:
-                came_from[neighbor] = (current_state, action)
-                g_neighbor = g_val + 1  # costo acumulado
-                h = priority_function(neighbor, goal_positions, g_neighbor, board)
-                tie_breaker = 0
-                if tiebreaker_function:
-                    tie_breaker = tiebreaker_function(neighbor, goal_positions, board)
-                heapq.heappush(frontier, (h, tie_breaker, next(counter), neighbor, g_neighbor))
+            })
+
+        if limits is not None:
+            reason = limits.check(expanded_nodes_qty)
+            if reason is not None:
+                result = limit_result(reason, expanded_nodes_qty, len(frontier), start_time)
+                result["heuristic_cache_hits"] = cache.hits if cache else 0
+                result["heuristic_cache_misses"] = cache.misses if cache else 0
+                result["best_state"] = best_state
+                result["best_heuristic"] = int(best_h) if use_buckets and best_h != float('inf') else best_h
+                result["partial_solution"] = path_to(best_node)
+                return tree.with_collisions(result)
+
+        if push_mode:
+            successors = current_state.get_possible_pushes(board, deadlock_checks)
+        else:
+            successors = current_state.get_possible_moves(board, deadlock_checks)
+
+        g_neighbor = g_val + 1  # costo acumulado
+        new_neighbors = []
+        new_nodes = []
+        for action, neighbor in successors:
+            known = tree.node_of(neighbor)
+            if known is None:
+                new_neighbors.append(neighbor)
+                new_nodes.append(add_node(neighbor, node, action, g_neighbor, 0))
+            elif g_neighbor < g_values[known] and (reopen or known in frontier):
+                # Cheaper path: requeue if still open, reopen if already expanded
+                tree.set_parent(known, node, action)
+                g_values[known] = g_neighbor
+                open_states[known] = neighbor
+                frontier.push(known, entry_priority(h_values[known], g_neighbor))
+
+        if incremental:
+            values, data = evaluate_incremental(heuristic, new_neighbors, board, parent_data, cache)
+            for new_node, neighbor_data in zip(new_nodes, data):
+                node_data[new_node] = neighbor_data
+        else:
+            # h_values are floats; integer heuristics get the parent's h back as an int
+            parent_h = int(h_val) if use_buckets and h_val != float('inf') else h_val
+            values = evaluate_heuristic(heuristic, new_neighbors, board, cache, (current_state, parent_h))
+        for neighbor, new_node, h in zip(new_neighbors, new_nodes, values):
+            h_values[new_node] = h
+            open_states[new_node] = neighbor
+            frontier.push(new_node, entry_priority(h, g_neighbor))
 
     end_time = time.time()
-    return {
+    return tree.with_collisions({
         "result": "no solution",
         "cost": None,
         "expanded_nodes_qty": expanded_nodes_qty,
+        "heuristic_cache_hits": cache.hits if cache else 0,
+        "heuristic_cache_misses": cache.misses if cache else 0,
         "frontier_nodes_qty": len(frontier),
         "solution": "",
         "duration": end_time - start_time
-    }
+    })
 
@@ -0,0 +1,234 @@
+import heapq
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from utils.limits import limit_result
+
+INF = float('inf')
+STOP_REASONS = [None, "timeout", "limit"]  # codes published by the workers in the shared stop array
+POLL_SECONDS = 1  # how often the parent checks that the workers are still alive while waiting for them
+
+
+def solve_with_parallel_astar(initial_state, heuristic, board, workers=2, expansions_per_round=100, limits=None,
+                              deadlock_checks=None):
+    """
+    Hash-distributed A* (HDA*) over several worker processes.
+
+    Every state is owned by worker `state.key % workers`, which keeps its open
+    list and its g-values / parent pointers. Workers run in synchronized rounds:
+    each one expands up to expansions_per_round nodes, sends the successors to
+    their owners in one batch per destination, then receives and evaluates the
+    states it owns. After each round all workers publish the smallest f on their
+    open list and the cheapest goal they have seen; the search stops once no open
+    node can improve on that goal, so the first solution returned is optimal
+    (with an admissible heuristic, same as astar).
+
+    Takes the same heuristic functions as astar.solve_with_astar and returns the
+    same result dict. Limits are checked by every worker on its own expansions
+    (the node budget against the global count as of the last round); if any of
+    them runs out, all workers stop at the end of that round. Each worker prunes
+    with its own copy of deadlock_checks; their counts are added back to it.
+
+    If a worker fails, it breaks the barrier so the others stop too, and the
+    error is raised here as a RuntimeError with the worker's traceback.
+    """
+    start_time = time.time()
+    if limits is not None:
+        limits.start()
+    ctx = multiprocessing.get_context()
+
+    inboxes = [ctx.Queue() for _ in range(workers)]
+    requests = [ctx.Queue() for _ in range(workers)]
+    replies = ctx.Queue()
+    results = ctx.Queue()
+    barrier = ctx.Barrier(workers)
+    sent = ctx.Array('i', workers * workers, lock=False)  # sent[src * workers + dst] = batches sent this round
+    min_f = ctx.Array('d', [INF] * workers, lock=False)
+    incumbents = ctx.Array('d', [INF] * workers, lock=False)
+    expanded = ctx.Array('i', workers, lock=False)
+    stop = ctx.Array('i', workers, lock=False)
+
+    processes = [
+        ctx.Process(target=_worker, args=(rank, workers, initial_state, heuristic, board, expansions_per_round,
+                                          inboxes, requests, replies, results, barrier, sent, min_f, incumbents,
+                                          expanded, stop, limits, deadlock_checks))
+        for rank in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    stats = []
+    while len(stats) < workers:
+        try:
+            stat = results.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            # Workers only exit after the path is rebuilt, so a dead one here crashed without reporting
+            dead = next((process for process in processes if not process.is_alive()), None)
+            if dead is not None:
+                _terminate(processes)
+                raise RuntimeError(f"HDA* worker exited with code {dead.exitcode} before reporting")
+            continue
+        if "error" in stat:
+            _terminate(processes)
+            raise RuntimeError(f"HDA* worker {stat['rank']} failed:\n{stat['error']}")
+        stats.append(stat)
+    expanded_nodes_qty = sum(stat["expanded"] for stat in stats)
+    frontier_nodes_qty = sum(stat["frontier"] for stat in stats)
+    best = min(stats, key=lambda stat: stat["cost"])
+    stopped = next((stat["stopped"] for stat in stats if stat["stopped"]), None)
+    if deadlock_checks is not None:
+        for stat in stats:
+            deadlock_checks.add(stat["pruned"])
+
+    moves = None
+    if best["cost"] != INF and stopped is None:
+        # Walk the parent pointers back to the start, asking each state's owner
+        moves = []
+        state = best["goal"]
+        while True:
+            requests[state.key % workers].put(state)
+            parent, action = replies.get()
+            if parent is None:
+                break
+            moves.append(action)
+            state = parent
+        moves.reverse()
+
+    for request_queue in requests:
+        request_queue.put(None)
+    for process in processes:
+        process.join()
+
+    if stopped is not None:
+        return limit_result(stopped, expanded_nodes_qty, frontier_nodes_qty, start_time)
+
+    end_time = time.time()
+    if moves is None:
+        return {
+            "result": "no solution",
+            "cost": None,
+            "expanded_nodes_qty": expanded_nodes_qty,
+            "frontier_nodes_qty": frontier_nodes_qty,
+            "solution": "",
+            "duration": end_time - start_time
+        }
+    return {
+        "result": "solved",
+        "cost": len(moves),
+        "expanded_nodes_qty": expanded_nodes_qty,
+        "frontier_nodes_qty": frontier_nodes_qty,
+        "solution": "".join(moves),
+        "duration": end_time - start_time
+    }
+
+
+def _terminate(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+def _worker(rank, workers, initial_state, heuristic, board, expansions_per_round,
+            inboxes, requests, replies, results, barrier, sent, min_f, incumbents, expanded, stop, limits,
+            deadlock_checks):
+    try:
+        _search(rank, workers, initial_state, heuristic, board, expansions_per_round,
+                inboxes, requests, replies, results, barrier, sent, min_f, incumbents, expanded, stop, limits,
+                deadlock_checks)
+    except threading.BrokenBarrierError:
+        pass  # another worker failed and already reported it
+    except Exception:
+        barrier.abort()
+        results.put({"rank": rank, "error": traceback.format_exc()})
+
+
+def _search(rank, workers, initial_state, heuristic, board, expansions_per_round,
+            inboxes, requests, replies, results, barrier, sent, min_f, incumbents, expanded, stop, limits,
+            deadlock_checks):
+    counter = itertools.count()
+    frontier = []  # (f, h, counter, state, g)
+    g_table = {}  # state -> (g, parent, action)
+    expanded_nodes_qty = 0
+    incumbent = INF
+    goal = None
+    stopped = None
+    others_expanded = 0  # nodes expanded by the other workers, as of the last round
+
+    def receive(batch):
+        nonlocal incumbent, goal
+        for state, g_val, parent, action in batch:
+            known = g_table.get(state)
+            if known is not None and known[0] <= g_val:
+                continue
+            g_table[state] = (g_val, parent, action)
+            if state.is_goal_state(board):
+                if g_val < incumbent:
+                    incumbent, goal = g_val, state
+                continue
+            h_val = heuristic(state, board)
+            if h_val != INF:
+                heapq.heappush(frontier, (g_val + h_val, h_val, next(counter), state, g_val))
+
+    if initial_state.key % workers == rank:
+        receive([(initial_state, 0, None, None)])
+
+    while True:
+        # 1. Expand up to expansions_per_round nodes that could still beat the incumbent
+        outgoing = [[] for _ in range(workers)]
+        global_incumbent = min(incumbents[:])
+        for _ in range(expansions_per_round):
+            if not frontier or frontier[0][0] >= min(incumbent, global_incumbent):
+                break
+            f_val, h_val, _, state, g_val = heapq.heappop(frontier)
+            if g_table[state][0] < g_val:
+                continue  # stale entry, a cheaper path was found later
+            expanded_nodes_qty += 1
+            if limits is not None and stopped is None:
+                stopped = limits.check(others_expanded + expanded_nodes_qty)
+            for action, neighbor in state.get_possible_moves(board, deadlock_checks):
+                outgoing[neighbor.key % workers].append((neighbor, g_val + 1, state, action))
+
+        for dst in range(workers):
+            sent[rank * workers + dst] = 0
+            if dst != rank and outgoing[dst]:
+                inboxes[dst].put(outgoing[dst])
+                sent[rank * workers + dst] = 1
+        barrier.wait()
+
+        # 2. Receive the successors this worker owns
+        receive(outgoing[rank])
+        for _ in range(sum(sent[src * workers + rank] for src in range(workers))):
+            receive(inboxes[rank].get())
+
+        while frontier and g_table[frontier[0][3]][0] < frontier[0][4]:
+            heapq.heappop(frontier)
+        min_f[rank] = frontier[0][0] if frontier else INF
+        incumbents[rank] = incumbent
+        expanded[rank] = expanded_nodes_qty
+        stop[rank] = STOP_REASONS.index(stopped)
+        barrier.wait()
+
+        # 3. Stop once no open node anywhere can beat the best goal found, or a limit ran out
+        global_incumbent = min(incumbents[:])
+        if min(min_f[:]) >= global_incumbent:
+            stopped = None  # the search finished this round anyway
+            break
+        if any(stop[:]):
+            stopped = STOP_REASONS[max(stop[:])]
+            break
+        others_expanded = sum(expanded[:]) - expanded_nodes_qty
+
+    results.put({"expanded": expanded_nodes_qty, "frontier": len(frontier), "cost": incumbent, "goal": goal,
+                 "stopped": stopped, "pruned": deadlock_checks.pruned if deadlock_checks is not None else {}})
+
+    # Answer parent-pointer queries for path reconstruction
+    while True:
+        state = requests[rank].get()
+        if state is None:
+            break
+        _, parent, action = g_table[state]
+        replies.put((parent, action))
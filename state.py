@@ -18,35 +18,49 @@ l_checks = {
     "L": [((-1, -1), (-1, 0)),  # arriba-izquierda + arriba-misma
           ((1, -1), (1, 0))],  # abajo-izquierda + abajo-misma
 }
-from utils.draw import draw_sokoban
+from collections import deque
 class State:
     # Grid directions: up/down = row change, left/right = column change
 
-    def __init__(self, player, boxes):
+    def __init__(self, player, boxes, board, key=None):
         self.player = player
         self.boxes = frozenset(boxes)  # frozenset so states are hashable
-        self._hash = hash((self.player, self.boxes))
+        # Zobrist key: successors get it incrementally from their parent, otherwise it's computed from scratch
+        self.key = key if key is not None else board.zobrist_key(self.player, self.boxes)
     def __eq__(self, other):
         return self.player == other.player and self.boxes == other.boxes
 
     def __hash__(self):
-        return self._hash
+        return self.key
 
     def __repr__(self):
         return f"State(player={self.player}, boxes={set(self.boxes)})"
 
-    def is_goal_state(self, goal_positions):
+    def is_goal_state(self, board):
         """
         Returns True if all boxes are on the goal positions, False otherwise.
         """
-        return self.boxes == goal_positions
+        return self.boxes == board.goal_positions
 
 
-    def get_possible_moves(self,walls,goal_positions):
+    def box_cells(self, board):
+        return [board.index(box) for box in self.boxes]
+
+    def boxes_key(self):
+        return self.boxes
+
+    def get_possible_moves(self, board, checks=None):
+        walls = board.walls
+        zobrist = board.zobrist
         moves = []
 
+        player_idx = board.index(self.player)
+        base_key = self.key ^ zobrist.player[player_idx]
+
         for action, (di, dj) in directions.items():
             new_player = (self.player[0] + di, self.player[1] + dj)
+            new_idx = player_idx + board.move_offsets[action]
+            key = base_key ^ zobrist.player[new_idx]
 
             if new_player in walls:
                 continue
@@ -56,13 +70,293 @@ class State:
                 # If the box collides with a wall, or with another box, skip
                 if new_box_pos in  walls or new_box_pos in self.boxes:
                     continue
+                # A box on a dead square can never reach a goal
+                if new_box_pos in board.dead_squares:
+                    continue
 
                 new_boxes = frozenset(self.boxes - {new_player} | {new_box_pos})
-                moves.append((action, State(new_player, new_boxes)))
+                new_box_idx = new_idx + board.move_offsets[action]
+                # ...and neither can one that completes a known deadlock pattern
+                if board.deadlock_patterns.is_deadlock(new_boxes, new_box_idx):
+                    continue
+                # Optional freeze / corral checks (utils.deadlocks.DeadlockChecks)
+                if checks is not None and checks.is_dead_push(board, new_player, new_boxes, new_box_pos):
+                    continue
+                key ^= zobrist.box[new_idx] ^ zobrist.box[new_box_idx]
+                moves.append((action, State(new_player, new_boxes, board, key)))
+            else:
+                moves.append((action, State(new_player, self.boxes, board, key)))
+
+        return moves
+
+    def reachable_cells(self, board):
+        """
+        Flood fill of the cells the player can walk to without pushing any box.
+        """
+        reached = {self.player}
+        queue = deque([self.player])
+        while queue:
+            r, c = queue.popleft()
+            for di, dj in directions.values():
+                neighbor = (r + di, c + dj)
+                if neighbor in reached or neighbor in board.walls or neighbor in self.boxes:
+                    continue
+                reached.add(neighbor)
+                queue.append(neighbor)
+        return reached
+
+    def normalized(self, board, reachable=None):
+        """
+        Returns the same box configuration with the player moved to the top-left
+        cell of its reachable area, so states that only differ by where the player
+        walked to collapse into a single one.
+        """
+        if reachable is None:
+            reachable = self.reachable_cells(board)
+        canonical = min(reachable)
+        key = self.key ^ board.zobrist.player[board.index(self.player)] ^ board.zobrist.player[board.index(canonical)]
+        return State(canonical, self.boxes, board, key)
+
+    def get_possible_pushes(self, board, checks=None):
+        """
+        Push-level successors: only box pushes are generated, the walk needed to
+        reach each box is implicit. Every successor is normalized (see normalized()).
+
+        Each action is a (box_position, direction) pair; pushes_to_moves() expands
+        a list of them back into the U/D/L/R move string.
+        """
+        reachable = self.reachable_cells(board)
+        zobrist = board.zobrist
+        pushes = []
+
+        for box in self.boxes:
+            for action, (di, dj) in directions.items():
+                # The player has to stand right behind the box
+                if (box[0] - di, box[1] - dj) not in reachable:
+                    continue
+                new_box_pos = (box[0] + di, box[1] + dj)
+                if new_box_pos in board.walls or new_box_pos in self.boxes:
+                    continue
+                if new_box_pos in board.dead_squares:
+                    continue
+
+                new_boxes = self.boxes - {box} | {new_box_pos}
+                new_box_idx = board.index(new_box_pos)
+                if board.deadlock_patterns.is_deadlock(new_boxes, new_box_idx):
+                    continue
+                if checks is not None and checks.is_dead_push(board, box, new_boxes, new_box_pos):
+                    continue
+
+                box_idx = board.index(box)
+                key = self.key ^ zobrist.player[board.index(self.player)] ^ zobrist.player[box_idx] \
+                    ^ zobrist.box[box_idx] ^ zobrist.box[new_box_idx]
+                new_state = State(box, new_boxes, board, key)
+                pushes.append(((box, action), new_state.normalized(board)))
+
+        return pushes
+
+    def get_possible_pulls(self, board):
+        """
+        Reverse of get_possible_pushes, used to search backwards from the goal.
+
+        The player, standing next to a box, steps away from it dragging the box
+        one cell along. Each action is a (box_position, direction) pair: the box
+        moves one cell in that direction and the player ends one cell further.
+        Every successor is normalized.
+        """
+        reachable = self.reachable_cells(board)
+        zobrist = board.zobrist
+        pulls = []
+
+        for box in self.boxes:
+            for action, (di, dj) in directions.items():
+                new_box_pos = (box[0] + di, box[1] + dj)
+                new_player = (new_box_pos[0] + di, new_box_pos[1] + dj)
+                # The player must be able to stand next to the box and step back
+                if new_box_pos not in reachable or new_player not in reachable:
+                    continue
+
+                key = self.key ^ zobrist.player[board.index(self.player)] ^ zobrist.player[board.index(new_player)] \
+                    ^ zobrist.box[board.index(box)] ^ zobrist.box[board.index(new_box_pos)]
+                new_state = State(new_player, self.boxes - {box} | {new_box_pos}, board, key)
+                pulls.append(((box, action), new_state.normalized(board)))
+
+        return pulls
+
+
+class CompactState:
+    """
+    Memory-lean alternative to State with the same interface, so it can be used
+    by every solver.
+
+    The player is stored as a linear cell index and the boxes as an int bitmask
+    (bit i set = box on cell i), so hashing and equality work on plain ints and
+    moving a box is a couple of bit operations instead of building a new frozenset.
+    The player / boxes properties decode back to (row, col) tuples for heuristics.
+    """
+    __slots__ = ("board", "player_idx", "box_mask", "key")
+
+    def __init__(self, board, player_idx, box_mask, key=None):
+        self.board = board
+        self.player_idx = player_idx
+        self.box_mask = box_mask
+        self.key = key if key is not None else board.zobrist.key(player_idx, self.box_indices())
+
+    @classmethod
+    def from_positions(cls, board, player, boxes):
+        return cls(board, board.index(player), board.mask_of(boxes))
+
+    def __eq__(self, other):
+        return self.player_idx == other.player_idx and self.box_mask == other.box_mask
+
+    def __hash__(self):
+        return self.key
+
+    def __repr__(self):
+        return f"CompactState(player={self.player}, boxes={set(self.boxes)})"
+
+    @property
+    def player(self):
+        return self.board.position(self.player_idx)
+
+    @property
+    def boxes(self):
+        return frozenset(self.board.position(idx) for idx in self.box_indices())
+
+    def box_indices(self):
+        mask = self.box_mask
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def box_cells(self, board):
+        return list(self.box_indices())
+
+    def boxes_key(self):
+        return self.box_mask
+
+    def is_goal_state(self, board):
+        return self.box_mask == board.goal_mask
+
+    def get_possible_moves(self, board, checks=None):
+        zobrist = board.zobrist
+        base_key = self.key ^ zobrist.player[self.player_idx]
+        moves = []
+
+        for action, offset in board.move_offsets.items():
+            new_player = self.player_idx + offset
+
+            if board.wall_map[new_player]:
+                continue
+            key = base_key ^ zobrist.player[new_player]
+
+            if self.box_mask >> new_player & 1:
+                new_box = new_player + offset
+                # Same rules as State: walls, other boxes and dead squares block the push
+                if board.wall_map[new_box] or self.box_mask >> new_box & 1 or board.dead_map[new_box]:
+                    continue
+                new_mask = self.box_mask ^ (1 << new_player) | (1 << new_box)
+                if board.deadlock_patterns.is_deadlock_mask(new_mask, new_box):
+                    continue
+                if checks is not None and checks.is_dead_push(
+                        board, board.position(new_player), board.positions_of(new_mask), board.position(new_box)):
+                    continue
+                key ^= zobrist.box[new_player] ^ zobrist.box[new_box]
+                moves.append((action, CompactState(board, new_player, new_mask, key)))
             else:
-                moves.append((action, State(new_player, self.boxes)))
+                moves.append((action, CompactState(board, new_player, self.box_mask, key)))
 
         return moves
 
+    def reachable_cells(self, board):
+        reached = {self.player_idx}
+        queue = deque([self.player_idx])
+        while queue:
+            idx = queue.popleft()
+            for offset in board.move_offsets.values():
+                neighbor = idx + offset
+                if neighbor in reached or board.wall_map[neighbor] or self.box_mask >> neighbor & 1:
+                    continue
+                reached.add(neighbor)
+                queue.append(neighbor)
+        return reached
+
+    def normalized(self, board, reachable=None):
+        if reachable is None:
+            reachable = self.reachable_cells(board)
+        canonical = min(reachable)
+        key = self.key ^ board.zobrist.player[self.player_idx] ^ board.zobrist.player[canonical]
+        return CompactState(board, canonical, self.box_mask, key)
+
+    def get_possible_pushes(self, board, checks=None):
+        reachable = self.reachable_cells(board)
+        zobrist = board.zobrist
+        pushes = []
+
+        for box in self.box_indices():
+            for action, offset in board.move_offsets.items():
+                if box - offset not in reachable:
+                    continue
+                new_box = box + offset
+                if board.wall_map[new_box] or self.box_mask >> new_box & 1 or board.dead_map[new_box]:
+                    continue
+                new_mask = self.box_mask ^ (1 << box) | (1 << new_box)
+                if board.deadlock_patterns.is_deadlock_mask(new_mask, new_box):
+                    continue
+                if checks is not None and checks.is_dead_push(
+                        board, board.position(box), board.positions_of(new_mask), board.position(new_box)):
+                    continue
+
+                key = self.key ^ zobrist.player[self.player_idx] ^ zobrist.player[box] \
+                    ^ zobrist.box[box] ^ zobrist.box[new_box]
+                new_state = CompactState(board, box, new_mask, key)
+                pushes.append(((board.position(box), action), new_state.normalized(board)))
+
+        return pushes
+
+
+def player_path(board, start, target, boxes):
+    """
+    Shortest walk (as a U/D/L/R string) from start to target without pushing boxes.
+    """
+    came_from = {start: None}
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        if current == target:
+            break
+        for action, (di, dj) in directions.items():
+            neighbor = (current[0] + di, current[1] + dj)
+            if neighbor in came_from or neighbor in board.walls or neighbor in boxes:
+                continue
+            came_from[neighbor] = (current, action)
+            queue.append(neighbor)
+
+    path = []
+    while came_from[target] is not None:
+        target, action = came_from[target]
+        path.append(action)
+    path.reverse()
+    return "".join(path)
+
+
+def pushes_to_moves(board, initial_state, pushes):
+    """
+    Expands a sequence of (box_position, direction) pushes found by a push-level
+    search into the full U/D/L/R move string, starting from the real (not
+    normalized) initial player position.
+    """
+    player = initial_state.player
+    boxes = set(initial_state.boxes)
+    moves = []
 
+    for box, action in pushes:
+        di, dj = directions[action]
+        moves.append(player_path(board, player, (box[0] - di, box[1] - dj), boxes))
+        moves.append(action)
+        boxes.remove(box)
+        boxes.add((box[0] + di, box[1] + dj))
+        player = box
 
+    return "".join(moves)
@@ -0,0 +1,167 @@
+"""
+    Database of 3x3 deadlock patterns.
+
+    Every 3x3 window of cells is one of 3^9 patterns (each cell is floor, wall
+    or box), indexed in base 3 in row-major order. The generator below proves,
+    once and for all, which of them are deadlocks, and stores the answer as a
+    bitset of 3^9 bits in deadlock_patterns_3x3.bin (next to this file). Boards
+    load it and, after every push, look up the windows around the pushed box.
+
+    To regenerate the file:
+
+    python3 utils/deadlock_patterns.py
+"""
+import os
+from collections import deque
+
+SIZE = 3
+CELLS = SIZE * SIZE
+FLOOR, WALL, BOX = 0, 1, 2
+PATTERN_COUNT = 3 ** CELLS
+PATTERN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deadlock_patterns_3x3.bin")
+
+_OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+def is_deadlock_pattern(cells):
+    """
+    True if the boxes of a window without goals can never all leave it.
+
+    The search is a relaxation that can only make the boxes freer, so a
+    deadlock it proves is also a deadlock on any board:
+    - the player can stand on any free cell (reachability is ignored);
+    - cells outside the window are free floor, and a box pushed out of the
+      window disappears.
+    Since no goal is inside the window, every box there has to leave it
+    eventually; if the empty window can't be reached, the pattern is a deadlock.
+    """
+    walls = frozenset(i for i, cell in enumerate(cells) if cell == WALL)
+    start = frozenset(i for i, cell in enumerate(cells) if cell == BOX)
+    if not start:
+        return False
+
+    def free(r, c, boxes):
+        if not (0 <= r < SIZE and 0 <= c < SIZE):
+            return True
+        i = r * SIZE + c
+        return i not in walls and i not in boxes
+
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        boxes = queue.popleft()
+        if not boxes:
+            return False
+        for box in boxes:
+            r, c = divmod(box, SIZE)
+            for dr, dc in _OFFSETS:
+                if not free(r - dr, c - dc, boxes) or not free(r + dr, c + dc, boxes):
+                    continue
+                nr, nc = r + dr, c + dc
+                moved = boxes - {box}
+                if 0 <= nr < SIZE and 0 <= nc < SIZE:
+                    moved = moved | {nr * SIZE + nc}
+                if moved not in seen:
+                    seen.add(moved)
+                    queue.append(moved)
+    return True
+
+
+def pattern_cells(index):
+    cells = []
+    for _ in range(CELLS):
+        index, cell = divmod(index, 3)
+        cells.append(cell)
+    return cells
+
+
+def generate(path=PATTERN_FILE):
+    bits = bytearray((PATTERN_COUNT + 7) // 8)
+    for index in range(PATTERN_COUNT):
+        if is_deadlock_pattern(pattern_cells(index)):
+            bits[index >> 3] |= 1 << (index & 7)
+    with open(path, "wb") as f:
+        f.write(bytes(bits))
+    return bits
+
+
+_patterns = None
+
+
+def load_patterns(path=PATTERN_FILE):
+    """The deadlock bitset, read once per process."""
+    global _patterns
+    if _patterns is None:
+        with open(path, "rb") as f:
+            _patterns = f.read()
+    return _patterns
+
+
+class DeadlockPatterns:
+    """
+    Pattern lookups for one board.
+
+    Only windows without goals are checked (the patterns assume none of their
+    boxes is done). Walls are fixed, so the wall part of each window's index is
+    precomputed and at lookup time only the boxes are added. Every cell keeps
+    the list of windows that contain it, so a push looks at (at most) the 9
+    windows around the pushed box.
+    """
+
+    def __init__(self, board):
+        self.bits = load_patterns()
+        # cell index -> [(wall index, [(cell, cell index, box weight)])]
+        self.windows_of = [[] for _ in range(board.rows * board.cols)]
+        for r0 in range(-1, board.rows - 1):
+            for c0 in range(-1, board.cols - 1):
+                window = self._window(board, r0, c0)
+                if window is None:
+                    continue
+                for _, idx, _ in window[1]:
+                    self.windows_of[idx].append(window)
+
+    @staticmethod
+    def _window(board, r0, c0):
+        base = 0
+        cells = []
+        for i in range(CELLS):
+            pos = (r0 + i // SIZE, c0 + i % SIZE)
+            if pos in board.goal_positions:
+                return None
+            if pos in board.walls or not (0 <= pos[0] < board.rows and 0 <= pos[1] < board.cols):
+                base += WALL * 3 ** i
+            else:
+                cells.append((pos, board.index(pos), BOX * 3 ** i))
+        return base, cells
+
+    def is_deadlock(self, boxes, box_idx):
+        """True if the box just pushed to cell box_idx completes a deadlock pattern (boxes as positions)."""
+        bits = self.bits
+        for index, cells in self.windows_of[box_idx]:
+            for pos, _, weight in cells:
+                if pos in boxes:
+                    index += weight
+            if bits[index >> 3] >> (index & 7) & 1:
+                return True
+        return False
+
+    def is_dead_position(self, board, boxes):
+        """True if any box of a whole position (e.g. the initial one) is in a deadlock pattern."""
+        return any(self.is_deadlock(boxes, board.index(box)) for box in boxes)
+
+    def is_deadlock_mask(self, box_mask, box_idx):
+        """Same as is_deadlock, with the boxes as a CompactState bitmask."""
+        bits = self.bits
+        for index, cells in self.windows_of[box_idx]:
+            for _, idx, weight in cells:
+                if box_mask >> idx & 1:
+                    index += weight
+            if bits[index >> 3] >> (index & 7) & 1:
+                return True
+        return False
+
+
+if __name__ == "__main__":
+    bits = generate()
+    deadlocks = sum(bin(byte).count("1") for byte in bits)
+    print(f"✅ {deadlocks} of {PATTERN_COUNT} patterns are deadlocks, saved in {PATTERN_FILE}")
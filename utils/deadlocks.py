@@ -0,0 +1,162 @@
+from collections import deque
+
+# Same order as state.directions (U, D, L, R); not imported to avoid a cycle with state.py
+OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+CORRAL_SEARCH_LIMIT = 500  # states the corral sub-search may expand before giving up
+
+
+class DeadlockChecks:
+    """
+    Optional deadlock checks of one run, passed by the solvers to the successor
+    generators (the Board stays the same for every run on a level). Every pruned
+    push is counted in `pruned` so the pruning can be compared with the time it costs.
+    """
+
+    def __init__(self, freeze=False, corral=False):
+        self.freeze = freeze
+        self.corral = corral
+        self.pruned = {"freeze": 0, "corral": 0}
+
+    def is_dead_push(self, board, player, boxes, box_pos):
+        """
+        Runs the enabled checks right after a push, looking only at the box that
+        was just pushed (to box_pos, with the player standing where the box was).
+        """
+        if self.freeze and is_freeze_deadlock(board, boxes, box_pos):
+            self.pruned["freeze"] += 1
+            return True
+        if self.corral and is_corral_deadlock(board, player, boxes, box_pos):
+            self.pruned["corral"] += 1
+            return True
+        return False
+
+    def add(self, pruned):
+        """Adds the counts of another copy (e.g. from an HDA* worker process)."""
+        for name, count in pruned.items():
+            self.pruned[name] += count
+
+
+def is_freeze_deadlock(board, boxes, box_pos):
+    """
+    True if the pushed box ends up frozen (it can't move along either axis, now or
+    ever) together with a frozen group that has some box off its goal.
+
+    A box is blocked along an axis if there is a wall on one side, dead squares on
+    both sides, or a box on one side that is itself frozen. While a neighbor is
+    checked, the boxes already being checked count as walls, which breaks cycles
+    (two boxes that can only move if the other one moves first are both stuck).
+    """
+    frozen = set()
+    if not _is_frozen(board, boxes, box_pos, set(), frozen):
+        return False
+    return any(box not in board.goal_positions for box in frozen)
+
+
+def _is_frozen(board, boxes, pos, checking, frozen):
+    checking.add(pos)
+    result = _is_blocked(board, boxes, pos, OFFSETS[0], checking, frozen) and \
+        _is_blocked(board, boxes, pos, OFFSETS[2], checking, frozen)
+    checking.discard(pos)
+    if result:
+        frozen.add(pos)
+    return result
+
+
+def _is_blocked(board, boxes, pos, axis, checking, frozen):
+    before = (pos[0] - axis[0], pos[1] - axis[1])
+    after = (pos[0] + axis[0], pos[1] + axis[1])
+    walls = board.walls
+    if before in walls or after in walls or before in checking or after in checking:
+        return True
+    if before in board.dead_squares and after in board.dead_squares:
+        return True
+    for side in (before, after):
+        if side in boxes and (side in frozen or _is_frozen(board, boxes, side, checking, frozen)):
+            return True
+    return False
+
+
+def is_corral_deadlock(board, player, boxes, box_pos):
+    """
+    PI-corral check for the area the push may have closed off.
+
+    A corral is a region of free cells next to the pushed box that the player can
+    no longer reach. It is an I-corral when every box on its border can only be
+    pushed into it, so sooner or later one of those boxes has to go in. Then a
+    small push search is run with only the border boxes (the rest are removed,
+    which can only make things easier): if it can neither open the corral nor put
+    all of them on goals, the real position can't either and it is a deadlock. The
+    sub-search gives up (no deadlock) after CORRAL_SEARCH_LIMIT states.
+    """
+    reachable = _reachable(board, player, boxes)
+    for di, dj in OFFSETS:
+        start = (box_pos[0] + di, box_pos[1] + dj)
+        if start in reachable or start in boxes or start not in board.floor:
+            continue
+        corral = _reachable(board, start, boxes)
+        border = {(r + dr, c + dc) for r, c in corral for dr, dc in OFFSETS} & boxes
+        if not _is_i_corral(board, boxes, reachable, corral, border):
+            continue
+        if not _can_place_on_goals(board, player, frozenset(border), corral):
+            return True
+    return False
+
+
+def _is_i_corral(board, boxes, reachable, corral, border):
+    for r, c in border:
+        for dr, dc in OFFSETS:
+            if (r - dr, c - dc) not in reachable:
+                continue
+            target = (r + dr, c + dc)
+            if target in board.walls or target in boxes or target in board.dead_squares:
+                continue
+            if target not in corral:
+                return False
+    return True
+
+
+def _can_place_on_goals(board, player, boxes, corral):
+    """
+    Push-level BFS with only these boxes: can all of them reach goals?
+
+    Reaching a cell of the corral also counts as success: the corral is open
+    then and this check has nothing more to say (it only makes the answer more
+    conservative).
+    """
+    reachable = _reachable(board, player, boxes)
+    seen = {(min(reachable), boxes)}
+    queue = deque([(boxes, reachable)])
+    while queue and len(seen) <= CORRAL_SEARCH_LIMIT:
+        boxes, reachable = queue.popleft()
+        if boxes <= board.goal_positions or not reachable.isdisjoint(corral):
+            return True
+        for box in boxes:
+            for dr, dc in OFFSETS:
+                if (box[0] - dr, box[1] - dc) not in reachable:
+                    continue
+                target = (box[0] + dr, box[1] + dc)
+                if target in board.walls or target in boxes or target in board.dead_squares:
+                    continue
+                new_boxes = boxes - {box} | {target}
+                new_reachable = _reachable(board, box, new_boxes)
+                state = (min(new_reachable), new_boxes)
+                if state not in seen:
+                    seen.add(state)
+                    queue.append((new_boxes, new_reachable))
+    # An empty queue means every configuration was tried; otherwise the budget ran out (no verdict)
+    return bool(queue)
+
+
+def _reachable(board, start, boxes):
+    reached = {start}
+    queue = deque([start])
+    while queue:
+        r, c = queue.popleft()
+        for dr, dc in OFFSETS:
+            neighbor = (r + dr, c + dc)
+            if neighbor in reached or neighbor not in board.floor or neighbor in boxes:
+                continue
+            reached.add(neighbor)
+            queue.append(neighbor)
+    return reached
@@ -28,9 +28,8 @@ def load_and_aggregate_results(folder="results"):
         if file.endswith(".csv"):
             df = pd.read_csv(os.path.join(folder, file))
 
-            # el nombre del board arranca con "bX" antes de "_"
-            board_name = file.split("_")[0]
-            df["board"] = board_name
+            # la columna board trae el path del tablero (boards/bX.txt): nos quedamos con "bX"
+            df["board"] = df["board"].map(lambda path: os.path.splitext(os.path.basename(str(path)))[0])
 
             dfs.append(df)
 
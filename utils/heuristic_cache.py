@@ -0,0 +1,31 @@
+from collections import OrderedDict
+
+
+class HeuristicCache:
+    """
+    Bounded LRU cache of heuristic values keyed by the box configuration.
+
+    Most heuristics only look at the boxes, so every player position around the
+    same boxes gets the same value. When max_size entries are stored the least
+    recently used one is evicted, so memory stays bounded on long runs.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.values.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.values.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.values[key] = value
+        if len(self.values) > self.max_size:
+            self.values.popitem(last=False)
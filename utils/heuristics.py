@@ -1,8 +1,11 @@
 from state import directions, l_checks
+from utils.pattern_database import PatternDatabase
+import itertools
 import math
+import numpy as np
 
 
-def manhattan_distance(initial_state, goal_positions, walls):
+def manhattan_distance(initial_state, board):
     """
     Computes the Manhattan distance heuristic for a Sokoban state.
 
@@ -12,8 +15,8 @@ def manhattan_distance(initial_state, goal_positions, walls):
     Parameters:
     - initial_state: a State object representing the current Sokoban board,
       including the positions of the player and all boxes.
-    - goal_positions: a set of tuples (row, col) indicating the target positions
-      for the boxes.
+    - board: the Board of the level (walls, goal positions and precomputed
+      dead squares).
 
     Returns:
     - total_distance: int, the sum of minimum Manhattan distances for all boxes
@@ -24,11 +27,11 @@ def manhattan_distance(initial_state, goal_positions, walls):
     """
 
     for box in initial_state.boxes:
-        if has_deadlocks(initial_state.boxes, box, walls, goal_positions):
+        if has_deadlocks(initial_state.boxes, box, board):
             return float('inf')
 
     total_distance = 0
-    remaining_goals = set(goal_positions)
+    remaining_goals = set(board.goal_positions)
 
     for box in initial_state.boxes:
         min_dist = float('inf')
@@ -44,7 +47,7 @@ def manhattan_distance(initial_state, goal_positions, walls):
 
     return total_distance
 
-def euclidean_distance(initial_state, goal_positions, walls):
+def euclidean_distance(initial_state, board):
     """
     Computes the Euclidean distance heuristic for a Sokoban state.
 
@@ -54,8 +57,8 @@ def euclidean_distance(initial_state, goal_positions, walls):
     Parameters:
     - initial_state: a State object representing the current Sokoban board,
       including the positions of the player and all boxes.
-    - goal_positions: a set of tuples (row, col) indicating the target positions
-      for the boxes.
+    - board: the Board of the level (walls, goal positions and precomputed
+      dead squares).
 
     Returns:
     - total_distance: float, the sum of minimum Euclidean distances for all boxes
@@ -66,11 +69,11 @@ def euclidean_distance(initial_state, goal_positions, walls):
     """
 
     for box in initial_state.boxes:
-        if has_deadlocks(initial_state.boxes, box, walls, goal_positions):
+        if has_deadlocks(initial_state.boxes, box, board):
             return float('inf')
 
     total_distance = 0.0
-    remaining_goals = set(goal_positions)
+    remaining_goals = set(board.goal_positions)
 
     for box in initial_state.boxes:
         min_dist = float('inf')
@@ -86,7 +89,7 @@ def euclidean_distance(initial_state, goal_positions, walls):
 
     return total_distance
 
-def manhattan_linear_conflicts_distance(initial_state, goal_positions, walls):
+def manhattan_linear_conflicts_distance(initial_state, board):
     """
     Manhattan distance + Linear Conflicts heuristic for Sokoban.
 
@@ -102,10 +105,10 @@ def manhattan_linear_conflicts_distance(initial_state, goal_positions, walls):
     """
 
     for box in initial_state.boxes:
-        if has_deadlocks(initial_state.boxes, box, walls, goal_positions):
+        if has_deadlocks(initial_state.boxes, box, board):
             return float('inf')
 
-    total_distance, box_to_goal = detail_manhattan_distance(initial_state, goal_positions)
+    total_distance, box_to_goal = detail_manhattan_distance(initial_state, board)
 
     conflicts = 0
 
@@ -127,13 +130,13 @@ def manhattan_linear_conflicts_distance(initial_state, goal_positions, walls):
 
     return total_distance + 2 * conflicts
 
-def detail_manhattan_distance(initial_state, goal_positions):
+def detail_manhattan_distance(initial_state, board):
     """
     Same as manhettan_distance but also return box_to_goal
     """
 
     total_distance = 0
-    remaining_goals = set(goal_positions)
+    remaining_goals = set(board.goal_positions)
     box_to_goal = {}
 
     for box in initial_state.boxes:
@@ -152,7 +155,7 @@ def detail_manhattan_distance(initial_state, goal_positions):
     return total_distance, box_to_goal
 
 
-def manhattan_plus_player_distance(initial_state, goal_positions, walls):
+def manhattan_plus_player_distance(initial_state, board):
     """
        Computes a non-admissible heuristic for a Sokoban state.
 
@@ -163,8 +166,8 @@ def manhattan_plus_player_distance(initial_state, goal_positions, walls):
        Parameters:
        - initial_state: a State object representing the current Sokoban board,
          including the positions of the player and all boxes.
-       - goal_positions: a set of tuples (row, col) indicating the target positions
-         for the boxes.
+       - board: the Board of the level (walls, goal positions and precomputed
+         dead squares).
 
        Returns:
        - total_distance: int, the sum of minimum Manhattan distances for all boxes
@@ -176,7 +179,7 @@ def manhattan_plus_player_distance(initial_state, goal_positions, walls):
          and therefore is non-admissible.
        """
     # Use the already implemented Manhattan distance for boxes to goals
-    total_distance = manhattan_distance(initial_state, goal_positions, walls)
+    total_distance = manhattan_distance(initial_state, board)
 
     # Distance from player to all boxes
     total_distance += sum(abs(initial_state.player[0] - box[0]) + abs(initial_state.player[1] - box[1]) for box in initial_state.boxes)
@@ -185,27 +188,276 @@ def manhattan_plus_player_distance(initial_state, goal_positions, walls):
 
 
 
+def hungarian_distance(initial_state, board):
+    """
+    Optimal box-to-goal assignment over precomputed push distances.
 
-def has_deadlocks(new_boxes, new_box_pos, walls, goal_positions):
+    Each box gets its own goal so that the total number of pushes is minimal
+    (Hungarian algorithm), using the board's push distances instead of Manhattan
+    distance, so walls are taken into account.
 
-    if new_box_pos in goal_positions:
-        return False
+    Parameters:
+    - initial_state: a State object representing the current Sokoban board.
+    - board: the Board of the level, with push_distances from every cell to every goal.
 
-    row, col = new_box_pos
+    Returns:
+    - total_distance: int, the minimum total number of pushes over all
+      box-to-goal assignments (inf if some box can't reach any free goal).
+
+    Notes:
+    - Admissible: each push moves a single box one cell, and other boxes are ignored.
+    - Solves the assignment from scratch in O(n^3). Searches that keep per-node
+      data use hungarian_distance.incremental instead, which repairs the
+      parent's assignment for the box that moved in O(n^2).
+    """
+    return _hungarian_incremental(initial_state, board, None)[0]
+
+
+def _hungarian_incremental(initial_state, board, parent_matching):
+    """
+    hungarian_distance, reusing the parent's matching.
+
+    Returns (h, matching): the matching is kept by the search for the node and
+    passed back as parent_matching when its children are evaluated.
+    """
+    for box in initial_state.boxes:
+        if has_deadlocks(initial_state.boxes, box, board):
+            return float('inf'), None
+
+    matching = board.box_goal_matcher.match(initial_state.boxes, parent_matching)
+    return matching.cost(), matching
+
+
+def push_distance(initial_state, board):
+    """
+    Sum, for each box, of the minimum number of pushes to its nearest goal.
+
+    The distances come from the board's push table (reverse BFS from every goal
+    taking walls into account), so evaluating the heuristic is one table lookup
+    per box.
+
+    Parameters:
+    - initial_state: a State object representing the current Sokoban board.
+    - board: the Board of the level, with the precomputed push_table.
+
+    Returns:
+    - total_distance: int, sum of the push distances of every box to its nearest
+      goal (inf if some box is on a cell from which no goal can be reached).
+
+    Notes:
+    - Admissible: several boxes may share the same nearest goal, so it never
+      overestimates (hungarian_distance is the tighter, more expensive version).
+    """
+    box_cells = [board.index(box) for box in initial_state.boxes]
+    return _table_sum(board.nearest_goal_distance[box_cells])
+
+
+def push_distance_player(initial_state, board):
+    """
+    push_distance plus the steps the player needs to get next to a box.
+
+    Returns:
+    - total_distance: int, push_distance + Manhattan distance from the player to
+      the closest box that is not on a goal, minus one (the player only has to
+      reach an adjacent cell).
+
+    Notes:
+    - Still admissible when the cost is counted in player moves.
+    """
+    total_distance = push_distance(initial_state, board)
+    pending = [box for box in initial_state.boxes if box not in board.goal_positions]
+    if pending and total_distance != float('inf'):
+        px, py = initial_state.player
+        total_distance += min(abs(px - box[0]) + abs(py - box[1]) for box in pending) - 1
+    return total_distance
+
+
+def pattern_database_distance(initial_state, board):
+    """
+    Additive pattern database heuristic over pairs of boxes.
+
+    The boxes are split into disjoint pairs and the exact push cost of each
+    pair (solved alone, see utils.pattern_database) is added up; boxes left
+    without a pair add their push distance to the nearest goal. Pairs are picked
+    greedily, those that interact the most (cost above the two single distances)
+    first.
+
+    Parameters:
+    - initial_state: a State object representing the current Sokoban board.
+    - board: the Board of the level. The solvers build (or load from
+      .pdb_cache) the board's pair database through pattern_database_distance.prepare
+      before the search starts; otherwise the first call does.
+
+    Returns:
+    - total_distance: int, sum of the group costs (inf if some group can't be
+      solved even on its own).
+
+    Notes:
+    - Admissible: any partition of the boxes into disjoint groups gives a lower
+      bound on the pushes, and every push is at least one move.
+    - At least as large as push_distance, since a pair never costs less than its
+      two boxes separately.
+    """
+    return _pattern_database_sum(initial_state.box_cells(board), board, 2)
+
+
+def pattern_database3_distance(initial_state, board):
+    """
+    Same as pattern_database_distance with groups of three boxes (the remaining
+    one or two use the single distances and the pair database).
+
+    Notes:
+    - Tighter than the pair version, but the triple database takes longer to
+      build the first time a board is solved.
+    """
+    return _pattern_database_sum(initial_state.box_cells(board), board, 3)
+
+
+def _pattern_database_sum(box_cells, board, size):
+    singles = board.nearest_goal_distance[box_cells]
+    if np.isinf(singles).any():
+        return float('inf')
+    single_cost = dict(zip(box_cells, singles.astype(int).tolist()))
+
+    total = 0
+    remaining = list(box_cells)
+    while len(remaining) >= 2:
+        pdb = PatternDatabase.for_board(board, min(size, len(remaining)))
+        best_group, best_cost, best_gain = None, 0, 0
+        for group in itertools.combinations(remaining, pdb.size):
+            cost = pdb.cost(list(group))
+            if cost == float('inf'):
+                return cost
+            gain = cost - sum(single_cost[cell] for cell in group)
+            if gain > best_gain:
+                best_group, best_cost, best_gain = group, cost, gain
+        if best_group is None:
+            break
+        total += best_cost
+        for cell in best_group:
+            remaining.remove(cell)
+    return total + sum(single_cost[cell] for cell in remaining)
+
+
+def _build_pattern_databases(board, size):
+    """Builds (or loads) every database _pattern_database_sum can ask for with groups of up to `size` boxes."""
+    for group_size in range(2, min(size, len(board.box_positions)) + 1):
+        PatternDatabase.for_board(board, group_size)
+
+
+def _table_sum(distances):
+    total = distances.sum()
+    return float('inf') if np.isinf(total) else int(total)
+
+
+# Batch versions: evaluate many states in one vectorized call.
+# box_cells is an (n_states, n_boxes) array of cell indices, player_cells an (n_states,) array.
+
+def _push_distance_batch(box_cells, player_cells, board):
+    return board.nearest_goal_distance[box_cells].sum(axis=1)
 
-    corner_checks = [
-        (directions['U'], directions['R']),
-        (directions['R'], directions['D']),
-        (directions['D'], directions['L']),
-        (directions['L'], directions['U'])
-    ]
 
-    # corner check
-    for d1, d2 in corner_checks:
-        r1, c1 = row + d1[0], col + d1[1]
-        r2, c2 = row + d2[0], col + d2[1]
-        if (r1, c1) in walls and (r2, c2) in walls:
-            return True
+def _manhattan_batch(box_cells, player_cells, board):
+    totals, _ = _greedy_assignment_batch(board.manhattan_table, box_cells)
+    return np.where(_deadlocks_batch(box_cells, board), np.inf, totals)
+
+
+def _euclidean_batch(box_cells, player_cells, board):
+    totals, _ = _greedy_assignment_batch(board.euclidean_table, box_cells)
+    return np.where(_deadlocks_batch(box_cells, board), np.inf, totals)
+
+
+def _linear_conflicts_batch(box_cells, player_cells, board):
+    totals, assigned = _greedy_assignment_batch(board.manhattan_table, box_cells)
+    box_rows, box_cols = np.divmod(box_cells, board.cols)
+    goal_rows = np.array([goal[0] for goal in board.goal_order])[assigned]
+    goal_cols = np.array([goal[1] for goal in board.goal_order])[assigned]
+
+    def reversed_pairs(line, line_goal, order, order_goal):
+        # Boxes on the same line as each other and as their goals, in the opposite order to their goals
+        aligned = line == line_goal
+        same = aligned[:, :, None] & aligned[:, None, :] & (line[:, :, None] == line[:, None, :])
+        crossed = (order[:, :, None] - order[:, None, :]) * (order_goal[:, :, None] - order_goal[:, None, :]) < 0
+        return (same & crossed).sum(axis=(1, 2)) // 2  # every pair is counted twice
+
+    conflicts = reversed_pairs(box_rows, goal_rows, box_cols, goal_cols) + \
+        reversed_pairs(box_cols, goal_cols, box_rows, goal_rows)
+    return np.where(_deadlocks_batch(box_cells, board), np.inf, totals + 2 * conflicts)
+
+
+def _greedy_assignment_batch(table, box_cells):
+    """
+    The greedy box-goal assignment of manhattan_distance for every state at once:
+    each box, in order, takes the closest goal still free (the first one in
+    board.goal_order on ties). Returns the totals and the goal index of each box.
+    """
+    distances = table[box_cells]  # (n_states, n_boxes, n_goals)
+    states = np.arange(len(box_cells))
+    taken = np.zeros((len(box_cells), distances.shape[2]), dtype=bool)
+    totals = np.zeros(len(box_cells))
+    assigned = np.empty(box_cells.shape, dtype=np.int64)
+    for i in range(box_cells.shape[1]):
+        options = np.where(taken, np.inf, distances[:, i])
+        goal = options.argmin(axis=1)
+        totals += options[states, goal]
+        taken[states, goal] = True
+        assigned[:, i] = goal
+    return totals, assigned
+
+
+def _deadlocks_batch(box_cells, board):
+    """has_deadlocks over every box of every state, as an (n_states,) bool array."""
+    size = board.rows * board.cols
+    states = np.arange(len(box_cells))[:, None]
+    occupied = np.zeros((len(box_cells), size), dtype=bool)
+    occupied[states, box_cells] = True
+    dead = board.dead_box_map[box_cells].any(axis=1)
+    for action, offset in board.move_offsets.items():
+        # Cells flagged in pair_dead_maps always have their neighbor inside the grid; % only keeps the rest valid
+        dead |= (board.pair_dead_maps[action][box_cells] & occupied[states, (box_cells + offset) % size]).any(axis=1)
+    return dead
+
+
+manhattan_distance.batch = _manhattan_batch
+euclidean_distance.batch = _euclidean_batch
+manhattan_linear_conflicts_distance.batch = _linear_conflicts_batch
+push_distance.batch = _push_distance_batch
+# Below this many states the NumPy call overhead costs more than the scalar loops
+# (measured on b14: about even at 8 states, 3-8 times slower at 1-3)
+for _heuristic in (manhattan_distance, euclidean_distance, manhattan_linear_conflicts_distance):
+    _heuristic.batch_min_states = 8
+
+# Incremental versions: incremental(state, board, parent_data) -> (h, data), where data is
+# whatever the heuristic wants kept for the node and gets back when evaluating its children.
+hungarian_distance.incremental = _hungarian_incremental
+
+# Setup run once per board before the search (and its limits) starts, for heuristics whose
+# first evaluation would otherwise be much slower than the rest.
+pattern_database_distance.prepare = lambda board: _build_pattern_databases(board, 2)
+pattern_database3_distance.prepare = lambda board: _build_pattern_databases(board, 3)
+
+# Heuristics whose finite values are always ints, so informed search can use a bucket queue
+for _heuristic in (manhattan_distance, manhattan_linear_conflicts_distance, manhattan_plus_player_distance,
+                   hungarian_distance, push_distance, push_distance_player, pattern_database_distance,
+                   pattern_database3_distance):
+    _heuristic.integer_valued = True
+
+# Heuristics that also depend on the player position, so they can't be cached by box configuration
+manhattan_plus_player_distance.uses_player = True
+push_distance_player.uses_player = True
+
+
+def has_deadlocks(new_boxes, new_box_pos, board):
+
+    if new_box_pos in board.goal_positions:
+        return False
+
+    # corner and wall-line checks only depend on the level, so they are precomputed by the Board
+    if new_box_pos in board.dead_squares:
+        return True
+
+    row, col = new_box_pos
+    walls = board.walls
 
     # box next to box with walls
     for key, (di, dj) in directions.items():
@@ -217,22 +469,4 @@ def has_deadlocks(new_boxes, new_box_pos, walls, goal_positions):
                 if (r1, c1) in walls and (r2, c2) in walls:
                     return True
 
-    # wall along row or column with no goals
-    for key, (di, dj) in directions.items():
-        neighbor = (row + di, col + dj)
-
-        if neighbor in walls:
-            if key in ["U", "D"]:
-                wall_row = [(row + di, c) for c in range(min(w[1] for w in walls), max(w[1] for w in walls) + 1)]
-                same_row = [(row, c) for c in range(min(w[1] for w in walls), max(w[1] for w in walls) + 1)]
-                if not any((row, c) in goal_positions for (_, c) in same_row) and all(
-                        pos in walls for pos in wall_row):
-                    return True
-
-            if key in ["L", "R"]:
-                wall_col = [(r, col + dj) for r in range(min(w[0] for w in walls), max(w[0] for w in walls) + 1)]
-                same_col = [(r, col) for r in range(min(w[0] for w in walls), max(w[0] for w in walls) + 1)]
-                if not any((r, col) in goal_positions for (r, _) in same_col) and all(
-                        pos in walls for pos in wall_col):
-                    return True
     return False
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_memory_mb():
+    """
+    Resident memory of this process in MB.
+
+    Reads /proc on Linux. Elsewhere it falls back to the peak resident size
+    reported by getrusage, and returns None where neither is available (Windows).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+    return None
+
+
+class SearchLimits:
+    """
+    Budget for a single search: wall time (seconds), expanded nodes and memory
+    (MB of the whole process). Any of them can be None (unbounded).
+
+    Solvers call check(expanded_nodes_qty) once per expansion. The node budget is
+    checked every time; the clock and memory only every check_every calls,
+    since reading them is comparatively expensive.
+    """
+
+    def __init__(self, time_limit=None, max_nodes=None, max_memory_mb=None, check_every=1000):
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.max_memory_mb = max_memory_mb
+        self.check_every = check_every
+        self.start_time = time.time()
+        self._calls = 0
+
+    def start(self):
+        self.start_time = time.time()
+        self._calls = 0
+        return self
+
+    def check(self, expanded_nodes_qty):
+        """None while within budget, "timeout" if the time ran out, "limit" for nodes or memory."""
+        if self.max_nodes is not None and expanded_nodes_qty >= self.max_nodes:
+            return "limit"
+        self._calls += 1
+        if self._calls % self.check_every:
+            return None
+        if self.time_limit is not None and time.time() - self.start_time >= self.time_limit:
+            return "timeout"
+        if self.max_memory_mb is not None:
+            memory = current_memory_mb()
+            if memory is not None and memory >= self.max_memory_mb:
+                return "limit"
+        return None
+
+
+def limit_result(reason, expanded_nodes_qty, frontier_nodes_qty, start_time):
+    """Result dict of a search stopped by its limits, with the metrics gathered so far."""
+    return {
+        "result": reason,
+        "cost": None,
+        "expanded_nodes_qty": expanded_nodes_qty,
+        "frontier_nodes_qty": frontier_nodes_qty,
+        "solution": "",
+        "duration": time.time() - start_time
+    }
@@ -0,0 +1,151 @@
+import numpy as np
+
+INF = float('inf')
+
+# Cost used for box/goal pairs with no possible push sequence
+UNREACHABLE = 10 ** 6
+
+
+class Assignment:
+    """
+    Minimum-cost assignment of rows to columns (n rows <= m columns) with the
+    Hungarian algorithm, in its shortest-augmenting-path form with potentials.
+
+    Rows are added one at a time, each in O(n * m). Because the potentials are
+    kept, a single row whose costs changed can be re-assigned with one more
+    augmentation instead of solving the whole problem again (see update_row).
+    """
+
+    def __init__(self, costs):
+        self._solve(costs)
+
+    def _solve(self, costs):
+        self.n = len(costs)
+        self.m = len(costs[0]) if costs else 0
+        # 1-indexed internally, row/column 0 are the algorithm's sentinels
+        self.costs = [[0] * (self.m + 1)] + [[0] + list(row) for row in costs]
+        self.u = [0] * (self.n + 1)
+        self.v = [0] * (self.m + 1)
+        self.p = [0] * (self.m + 1)  # p[j] = row assigned to column j (0 = free)
+        for i in range(1, self.n + 1):
+            self._augment(i)
+
+    def _augment(self, i):
+        costs, u, v, p, m = self.costs, self.u, self.v, self.p, self.m
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        way = [0] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            delta = INF
+            j1 = 0
+            row = costs[i0]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    def copy(self):
+        """Independent copy (cost rows are shared: update_row replaces a row instead of editing it)."""
+        other = Assignment.__new__(Assignment)
+        other.n, other.m = self.n, self.m
+        other.costs = list(self.costs)
+        other.u, other.v, other.p = list(self.u), list(self.v), list(self.p)
+        return other
+
+    def update_row(self, row_idx, row):
+        """
+        Replaces the costs of one row (0-indexed) and repairs the assignment.
+        Only square problems can be repaired incrementally, otherwise it re-solves.
+        """
+        i = row_idx + 1
+        self.costs[i] = [0] + list(row)
+        if self.n != self.m:
+            self._solve([r[1:] for r in self.costs[1:]])
+            return
+
+        for j in range(1, self.m + 1):
+            if self.p[j] == i:
+                self.p[j] = 0
+        # Lower the row potential so every reduced cost of the row is >= 0 again
+        self.u[i] = min(self.costs[i][j] - self.v[j] for j in range(1, self.m + 1))
+        self._augment(i)
+
+    def cost(self):
+        return sum(self.costs[self.p[j]][j] for j in range(1, self.m + 1) if self.p[j])
+
+
+class BoxMatching:
+    """Optimal assignment for one box configuration (row_of: box -> row of the assignment)."""
+    __slots__ = ("boxes", "row_of", "assignment")
+
+    def __init__(self, boxes, row_of, assignment):
+        self.boxes = boxes
+        self.row_of = row_of
+        self.assignment = assignment
+
+    def cost(self):
+        total = self.assignment.cost()
+        return INF if total >= UNREACHABLE else total
+
+
+class BoxGoalMatcher:
+    """
+    Optimal box-to-goal matching over the board's push distances.
+
+    Static per board (built once by the Board). match() solves a configuration
+    from scratch, or, given the matching of its parent, repairs a copy of it for
+    the one box that moved, which is the usual case between a node and its push
+    successors. The search keeps each open node's matching (see the incremental
+    hook of heuristics.hungarian_distance), so children are repaired from their
+    own parent, not from whatever configuration was evaluated last.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        # Columns follow board.goal_list; impossible pairs get a large finite cost
+        self.table = np.where(np.isinf(board.push_table), UNREACHABLE, board.push_table).astype(int)
+
+    def _row(self, box):
+        return self.table[:, self.board.index(box)].tolist()
+
+    def match(self, boxes, parent=None):
+        """BoxMatching for boxes, repaired from parent (a BoxMatching) when only one box differs."""
+        if parent is not None and len(parent.boxes) == len(boxes):
+            if parent.boxes == boxes:
+                return parent
+            removed = parent.boxes - boxes
+            if len(removed) == 1:
+                (old_box,) = removed
+                (new_box,) = boxes - parent.boxes
+                row_of = dict(parent.row_of)
+                row_idx = row_of.pop(old_box)
+                row_of[new_box] = row_idx
+                assignment = parent.assignment.copy()
+                assignment.update_row(row_idx, self._row(new_box))
+                return BoxMatching(boxes, row_of, assignment)
+
+        ordered = sorted(boxes)
+        return BoxMatching(boxes, {box: i for i, box in enumerate(ordered)},
+                           Assignment([self._row(box) for box in ordered]))
@@ -1,3 +1,4 @@
+import sys
 import time
 
 class Metrics:
@@ -24,3 +25,27 @@ class Metrics:
             "solution": self.solution,
             "duration": self.duration
         }
+
+
+def state_size_bytes(state):
+    """
+    Approximate memory taken by one search state: the object itself plus
+    everything it references (tuples, frozensets, ints...), except the shared Board.
+    """
+    seen = set()
+
+    def size_of(obj):
+        if id(obj) in seen or type(obj).__name__ == "Board":
+            return 0
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if isinstance(obj, (tuple, list, set, frozenset)):
+            size += sum(size_of(item) for item in obj)
+        if hasattr(obj, "__dict__"):
+            size += size_of(vars(obj))
+            size += sum(size_of(value) for value in vars(obj).values())
+        for slot in getattr(type(obj), "__slots__", ()):
+            size += size_of(getattr(obj, slot))
+        return size
+
+    return size_of(state)
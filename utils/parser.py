@@ -1,10 +1,15 @@
+from board import Board
+from utils.pattern_database import board_file_hash
+
+
 def parse_board_from_file(file_path):
     """
-    Parses a Sokoban board file and extracts:
+    Parses a Sokoban board file and builds a Board with:
     - walls: positions of walls
     - goal_positions: positions of goal squares
     - player_pos: initial player position
     - box_positions: initial box positions
+    plus all the static data derived from them (see board.Board).
     """
     walls = set()
     goal_positions = set()
@@ -30,4 +35,6 @@ def parse_board_from_file(file_path):
                     box_positions.add(pos)
                     goal_positions.add(pos)
 
-    return walls, goal_positions, player_pos, box_positions
+    board = Board(walls, goal_positions, player_pos, box_positions)
+    board.source_hash = board_file_hash(file_path)
+    return board
@@ -0,0 +1,143 @@
+import hashlib
+import itertools
+import os
+import tempfile
+from collections import deque
+import numpy as np
+
+# Bump when the table format or the way it is built changes, so old cache files are ignored
+FORMAT_VERSION = 1
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".pdb_cache")
+UNSOLVABLE = np.iinfo(np.uint16).max
+
+_OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+def board_file_hash(file_path):
+    """Hash of a board file's contents, used as the key of its cached databases."""
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class PatternDatabase:
+    """
+    Exact push costs for every subset of `size` boxes, with the other boxes removed.
+
+    The table is filled by a backward BFS: it starts from every way of putting
+    `size` boxes on goals (with the player in any free area) and pulls boxes away
+    from them, as in Board.pull_distances but with the boxes blocking each other.
+    table[i, j(, k)] is then the minimum number of pushes that takes boxes on
+    cells i < j (< k) to some goals (UNSOLVABLE if they can't all get there).
+    Cells are numbered over self.cells, the cells a box can be pulled to a goal from.
+
+    Since a solution never pushes fewer times a group of boxes than the same
+    group needs alone, the costs of disjoint groups can be added up.
+    """
+
+    def __init__(self, board, size, table):
+        self.size = size
+        self.table = table
+        self.cells = sorted(board.floor - board.simple_dead_squares)
+        # board cell index -> position in self.cells (-1 for walls and dead squares)
+        self.cell_map = np.full(board.rows * board.cols, -1, dtype=np.int64)
+        for i, pos in enumerate(self.cells):
+            self.cell_map[board.index(pos)] = i
+
+    @classmethod
+    def for_board(cls, board, size):
+        """
+        Database of the board for groups of `size` boxes. It is kept on the board
+        for the rest of the run and, if the board came from a file, cached in
+        .pdb_cache keyed by the file hash, so it's only built once per level.
+
+        Cache files are written to a temporary file and renamed into place, so an
+        interrupted build or several processes building the same table can't
+        leave a truncated file behind.
+        """
+        if size in board.pattern_databases:
+            return board.pattern_databases[size]
+
+        path = None
+        if board.source_hash is not None:
+            path = os.path.join(CACHE_DIR, f"{board.source_hash}_v{FORMAT_VERSION}_{size}.npy")
+        pdb = cls(board, size, None)
+        if path is not None and os.path.exists(path):
+            pdb.table = np.load(path)
+        else:
+            pdb.table = pdb._build(board)
+            if path is not None:
+                _save(path, pdb.table)
+        board.pattern_databases[size] = pdb
+        return pdb
+
+    def cost(self, box_cells):
+        """Pushes for a group of `size` boxes given as board cell indices (inf if unsolvable)."""
+        value = self.table[tuple(sorted(self.cell_map[box_cells]))]
+        return float('inf') if value == UNSOLVABLE else int(value)
+
+    def _build(self, board):
+        table = np.full((len(self.cells),) * self.size, UNSOLVABLE, dtype=np.uint16)
+        index = {pos: i for i, pos in enumerate(self.cells)}
+        seen = set()
+        queue = deque()
+
+        # Every group of goals, with the player in each free area around it
+        for goals in itertools.combinations(sorted(board.goal_positions & index.keys()), self.size):
+            boxes = frozenset(goals)
+            free = set(board.floor) - boxes
+            while free:
+                area = _area(board, next(iter(free)), boxes)
+                free -= area
+                state = (min(area), boxes)
+                if state not in seen:
+                    seen.add(state)
+                    queue.append((boxes, area, 0))
+
+        while queue:
+            boxes, area, distance = queue.popleft()
+            cells = tuple(sorted(index[box] for box in boxes))
+            if table[cells] == UNSOLVABLE:
+                table[cells] = distance
+
+            for box in boxes:
+                for dr, dc in _OFFSETS:
+                    # The player stands on new_box and steps back to new_player, dragging the box
+                    new_box = (box[0] + dr, box[1] + dc)
+                    new_player = (new_box[0] + dr, new_box[1] + dc)
+                    if new_box not in area or new_player not in area:
+                        continue
+                    new_boxes = boxes - {box} | {new_box}
+                    new_area = _area(board, new_player, new_boxes)
+                    state = (min(new_area), new_boxes)
+                    if state not in seen:
+                        seen.add(state)
+                        queue.append((new_boxes, new_area, distance + 1))
+        return table
+
+
+def _save(path, table):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".npy.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, table)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates it private
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _area(board, start, boxes):
+    """Floor cells the player can walk to from start."""
+    reached = {start}
+    queue = deque([start])
+    while queue:
+        r, c = queue.popleft()
+        for dr, dc in _OFFSETS:
+            neighbor = (r + dr, c + dc)
+            if neighbor in reached or neighbor not in board.floor or neighbor in boxes:
+                continue
+            reached.add(neighbor)
+            queue.append(neighbor)
+    return reached
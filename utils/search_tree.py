@@ -0,0 +1,103 @@
+from array import array
+from state import CompactState, directions
+
+MOVES = list(directions)  # "U", "D", "L", "R"
+
+
+class SearchTree:
+    """
+    Parent pointers of a search stored as columns instead of a came_from dict.
+
+    Every discovered state gets an integer node id; the parent id and the action
+    that reached it are kept in typed arrays, and states are looked up by their
+    64-bit Zobrist key. The tree therefore keeps no reference to the states
+    themselves (their tuples and frozensets), and rebuilding a path only walks
+    integer arrays. Push actions (box, direction) are packed as
+    box_cell * 4 + direction.
+
+    By default two different states sharing a key are taken as the same one.
+    With verify=True every node also keeps its state as two ints (player cell,
+    box bitmask, like CompactState) and a key hit is compared against it: a
+    collision is counted in `collisions` and the colliding state gets its own
+    node, as in utils.zobrist.KeyMap.
+    """
+
+    def __init__(self, board, push_mode=False, verify=False):
+        self.board = board
+        self.push_mode = push_mode
+        self.verify = verify
+        self.collisions = 0
+        self.ids = {}  # Zobrist key -> node id
+        self.parents = array('q')  # node id -> parent node id (-1 for the root)
+        self.actions = array('q')  # node id -> packed action (-1 for the root)
+        self.signatures = []  # node id -> (player cell, box mask) (only with verify)
+        self.overflow = {}  # signature -> node id, for states whose key was taken by another one (only with verify)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def __contains__(self, state):
+        return self.node_of(state) is not None
+
+    def node_of(self, state):
+        node = self.ids.get(state.key)
+        if node is None or not self.verify:
+            return node
+        signature = self._signature(state)
+        if self.signatures[node] == signature:
+            return node
+        self.collisions += 1
+        return self.overflow.get(signature)
+
+    def add(self, state, parent=-1, action=None):
+        """Registers a new state and returns its node id."""
+        node = len(self.parents)
+        if self.verify:
+            signature = self._signature(state)
+            self.signatures.append(signature)
+            if self.ids.setdefault(state.key, node) != node:
+                self.overflow[signature] = node
+        else:
+            self.ids[state.key] = node
+        self.parents.append(parent)
+        self.actions.append(self._encode(action))
+        return node
+
+    def set_parent(self, node, parent, action):
+        """Re-hangs a node under a new parent (a cheaper path was found)."""
+        self.parents[node] = parent
+        self.actions[node] = self._encode(action)
+
+    def path(self, node):
+        """Actions from the root to node."""
+        moves = []
+        while self.parents[node] != -1:
+            moves.append(self._decode(self.actions[node]))
+            node = self.parents[node]
+        moves.reverse()
+        return moves
+
+    def with_collisions(self, result):
+        """Adds the collisions found to a result dict (only with verify) and returns it."""
+        if self.verify:
+            result["key_collisions"] = self.collisions
+        return result
+
+    def _signature(self, state):
+        if isinstance(state, CompactState):
+            return state.player_idx, state.box_mask
+        return self.board.index(state.player), self.board.mask_of(state.boxes)
+
+    def _encode(self, action):
+        if action is None:
+            return -1
+        if self.push_mode:
+            box, direction = action
+            return self.board.index(box) * 4 + MOVES.index(direction)
+        return MOVES.index(action)
+
+    def _decode(self, code):
+        if self.push_mode:
+            cell, direction = divmod(code, 4)
+            return self.board.position(cell), MOVES[direction]
+        return MOVES[code]
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import sqlite3
+from state import State
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".solution_cache.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    board_hash TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    heuristic TEXT NOT NULL,
+    options TEXT NOT NULL,
+    cost INTEGER NOT NULL,
+    expanded_nodes_qty INTEGER NOT NULL,
+    frontier_nodes_qty INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    solution TEXT NOT NULL,
+    PRIMARY KEY (board_hash, algorithm, heuristic, options)
+)
+"""
+
+
+def board_hash(board):
+    """
+    Hash of the parsed level, moved so the walls start at row/column 0. Files
+    that only differ in blank lines, trailing spaces or indentation get the same hash.
+    """
+    def shifted(positions):
+        return sorted((r - board.min_row, c - board.min_col) for r, c in positions)
+
+    canonical = repr((shifted(board.walls), shifted(board.goal_positions), shifted(board.box_positions),
+                      shifted([board.player_pos])))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def replays_to_goal(board, solution):
+    """True if the moves are legal from the board's initial state and leave every box on a goal."""
+    state = State(board.player_pos, board.box_positions, board)
+    for move in solution:
+        state = dict(state.get_possible_moves(board)).get(move)
+        if state is None:
+            return False
+    return state.is_goal_state(board)
+
+
+class SolutionCache:
+    """
+    Solved runs stored in SQLite, keyed by the board hash, the algorithm, the
+    heuristic and the options that change the search (push mode, deadlock checks).
+
+    Only "solved" results are stored, with their solution and metrics. Every hit
+    is replayed on the board before being returned; an entry that doesn't reach
+    the goal is deleted and reported as a miss.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def get(self, board, algorithm, heuristic, options=""):
+        key = (board_hash(board), algorithm, heuristic, options)
+        row = self.connection.execute(
+            "SELECT cost, expanded_nodes_qty, frontier_nodes_qty, duration, solution FROM solutions "
+            "WHERE board_hash = ? AND algorithm = ? AND heuristic = ? AND options = ?", key).fetchone()
+        if row is None:
+            return None
+
+        cost, expanded, frontier, duration, solution = row
+        if len(solution) != cost or not replays_to_goal(board, solution):
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM solutions WHERE board_hash = ? AND algorithm = ? AND heuristic = ? AND options = ?",
+                    key)
+            return None
+        return {
+            "result": "solved",
+            "cost": cost,
+            "expanded_nodes_qty": expanded,
+            "frontier_nodes_qty": frontier,
+            "solution": solution,
+            "duration": duration,
+            "cached": True
+        }
+
+    def put(self, board, algorithm, heuristic, result, options=""):
+        if result["result"] != "solved":
+            return
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (board_hash(board), algorithm, heuristic, options, result["cost"], result["expanded_nodes_qty"],
+                 result["frontier_nodes_qty"], result["duration"], result["solution"]))
@@ -0,0 +1,66 @@
+import random
+
+
+class ZobristTable:
+    """
+    Random 64-bit keys per cell, one table for boxes and one for the player.
+
+    The key of a state is the XOR of the player key of its cell and the box key
+    of every box cell. Moving the player or a box only changes two entries, so a
+    successor's key is derived from its parent's key with a couple of XORs.
+    """
+
+    def __init__(self, size, seed=0):
+        rng = random.Random(seed)
+        self.box = [rng.getrandbits(64) for _ in range(size)]
+        self.player = [rng.getrandbits(64) for _ in range(size)]
+
+    def key(self, player_idx, box_indices):
+        key = self.player[player_idx]
+        for idx in box_indices:
+            key ^= self.box[idx]
+        return key
+
+
+class KeyMap:
+    """
+    Map from states to values that only stores the 64-bit Zobrist keys of the states.
+
+    Two different states sharing a key are indistinguishable by key alone. With
+    verify=True the state stored under each key is kept as well and compared on
+    every lookup: a collision is counted in `collisions`, is not reported as a
+    hit, and the colliding state gets its own entry, so the map stays exact (at
+    the cost of keeping the states in memory).
+    """
+
+    def __init__(self, verify=False):
+        self.verify = verify
+        self.collisions = 0
+        self._values = {}  # key -> value
+        self._states = {}  # key -> state stored under it (only with verify)
+        self._overflow = {}  # state -> value, for states whose key was taken by another one (only with verify)
+
+    def get(self, state, default=None):
+        if not self.verify:
+            return self._values.get(state.key, default)
+        stored = self._states.get(state.key)
+        if stored is None:
+            return default
+        if stored == state:
+            return self._values[state.key]
+        self.collisions += 1
+        return self._overflow.get(state, default)
+
+    def __setitem__(self, state, value):
+        if self.verify:
+            stored = self._states.setdefault(state.key, state)
+            if stored != state:
+                self._overflow[state] = value
+                return
+        self._values[state.key] = value
+
+    def __contains__(self, state):
+        return self.get(state) is not None
+
+    def __len__(self):
+        return len(self._values) + len(self._overflow)